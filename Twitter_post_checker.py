@@ -1,4 +1,5 @@
 import time
+import random
 import requests
 from selenium import webdriver
 from selenium.webdriver.common.by import By
@@ -12,75 +13,473 @@ from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
 from duckduckgo_search import DDGS
 import re
-from bs4 import BeautifulSoup
 import json
 import os
+import threading
+import queue
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from contextlib import contextmanager
+from dataclasses import dataclass, field, asdict
+
+from article_cache import ArticleCache
+from article_extractors import get_extractor
+from cancellation import CancelToken, CheckCancelled
+from context_packing import estimate_tokens, evidence_token_budget, fit_to_budget, pack_evidence
+from deadline import Deadline
+from driver_pool import DriverPool
+from latency import LatencyHistogram
+from model_router import ModelPolicy, ModelRouter
+from llm_cache import ResponseCache, response_cache_key
+from rate_limit import RateLimiter, parse_duration, parse_retry_after
+from relevance import adaptive_top_k, rank_hits
+from tweet_cache import TweetCache, tweet_status_id
+from tweet_json import is_tweet_payload_url, parse_tweet_payload
+from url_canon import collapse_near_duplicates, dedupe_urls
+from tracing import add_counts, annotate, propagate, tracer
 
 GROQ_API_KEY = os.environ.get("GROQ_API_KEY", "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")
+GROQ_REQUESTS_PER_MINUTE = int(os.environ.get("GROQ_REQUESTS_PER_MINUTE", "30"))
+GROQ_TOKENS_PER_MINUTE = int(os.environ.get("GROQ_TOKENS_PER_MINUTE", "6000"))
+MAX_RATE_LIMIT_WAIT = 20.0
+REQUEST_TIMEOUT = 30
+MIN_CALL_BUDGET = 1.0
+HEDGE_REQUESTS = os.environ.get("GROQ_HEDGE", "0") == "1"
+HEDGE_MIN_SAMPLES = 20
+HEDGE_DEFAULT_DELAY = 4.0
+_hedge_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="llm")
+
+tweet_cache = TweetCache()
+article_cache = ArticleCache()
+llm_response_cache = ResponseCache(ttl=int(os.environ.get("LLM_CACHE_TTL", str(15 * 60))))
+driver_pool = None
+_driver_pool_lock = threading.Lock()
+_chromedriver_path = None
+
+SEARCH_WORKERS = int(os.environ.get("SEARCH_WORKERS", "3"))
+SEARCH_TIMEOUT = 10
+SEARCH_STAGE_DEADLINE = 20
+_search_executor = ThreadPoolExecutor(max_workers=SEARCH_WORKERS, thread_name_prefix="search")
+_search_clients = threading.local()
+
+ARTICLE_WORKERS = int(os.environ.get("ARTICLE_WORKERS", "3"))
+ARTICLE_MAX_BYTES = 512 * 1024
+_article_executor = ThreadPoolExecutor(max_workers=ARTICLE_WORKERS, thread_name_prefix="article")
+_article_fanout = ARTICLE_WORKERS
+_fanout_lock = threading.Lock()
+ARTICLE_TIMEOUT = 10
+ARTICLE_MAX_FETCH = 3
+
+TWEET_TIMEOUT = 20
+CHECK_DEADLINE = float(os.environ.get("CHECK_DEADLINE", "90"))
+# Seconds kept back for the verdict call while earlier stages run
+VERDICT_RESERVE = 10.0
+
+# Two-tier verdict: try the search snippets first and read full articles only when that is not conclusive
+TWO_TIER_VERDICT = os.environ.get("CHECKER_TWO_TIER", "1") == "1"
+VERDICT_CONFIDENCE_THRESHOLD = float(os.environ.get("VERDICT_CONFIDENCE_THRESHOLD", "80"))
+SNIPPET_EVIDENCE_COUNT = 5
+http_session = None
+_http_session_lock = threading.Lock()
+
+
+BACKUP_MODELS = ["llama2-7b-4096", "mixtral-8x7b-32768"]
 
 
 class GroqAPI:
-    def __init__(self, model_id="llama3-8b-8192", api_key=None):
+    def __init__(self, model_id="llama3-8b-8192", api_key=None, cache=None,
+                 requests_per_minute=GROQ_REQUESTS_PER_MINUTE, tokens_per_minute=GROQ_TOKENS_PER_MINUTE,
+                 hedge=False, hedge_percentile=95, router=None):
         self.model_id = model_id
         self.api_key = api_key or GROQ_API_KEY
         self.api_url = "https://api.groq.com/openai/v1/chat/completions"
-        self.backup_models = ["llama2-7b-4096", "mixtral-8x7b-32768"]
-        self.current_model_index = 0
-
-    def switch_to_backup_model(self):
-        if self.current_model_index < len(self.backup_models):
-            self.model_id = self.backup_models[self.current_model_index]
-            self.current_model_index += 1
-            print(f"Switched to backup model: {self.model_id}")
-            return True
-        return False
+        self.backup_models = list(BACKUP_MODELS)
+        self.cache = cache
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.limiters = {}
+        self.cooldowns = {}
+        self.latencies = {}
+        self.hedge = hedge
+        self.hedge_percentile = hedge_percentile
+        self.router = router
+        self.last_model = None
+        self.lock = threading.Lock()
+
+        self.session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=16)
+        self.session.mount("https://", adapter)
+        self.session.headers.update({
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json"
+        })
+
+    def limiter(self, model):
+        with self.lock:
+            if model not in self.limiters:
+                self.limiters[model] = RateLimiter(self.requests_per_minute, self.tokens_per_minute)
+            return self.limiters[model]
+
+    def latency(self, model):
+        with self.lock:
+            if model not in self.latencies:
+                self.latencies[model] = LatencyHistogram()
+            return self.latencies[model]
+
+    def candidate_models(self, primary=None, task=None, exclude=()):
+        """Models a call may use, in order: ``primary``, the routed task's candidates, then the backups."""
+        fallbacks = list(self.backup_models)
+        policy = self.router.policies.get(task) if self.router is not None and task is not None else None
+        if policy is not None:
+            fallbacks = list(policy.candidates) + fallbacks
+        models = []
+        for model in [primary or self.model_id] + fallbacks:
+            if model not in exclude and model not in models:
+                models.append(model)
+        return models
+
+    def select_model(self, exclude=(), primary=None, task=None):
+        """Return the first candidate model, primary first, that is not cooling down after a rate limit."""
+        now = time.monotonic()
+        with self.lock:
+            for model in self.candidate_models(primary, task, exclude):
+                if self.cooldowns.get(model, 0) <= now:
+                    return model
+        return None
 
-    def generate(self, prompt, **kwargs):
-        max_retries = 3
-        retry_count = 0
+    def acquire_model(self, token_estimate, primary=None, max_wait=MAX_RATE_LIMIT_WAIT, task=None):
+        """Pick a model and reserve rate-limit budget on it, waiting out short cooldowns.
+
+        Returns None when every candidate is rate limited for longer than
+        ``max_wait`` seconds, counted over all the waiting this call does.
+        """
+        give_up_at = time.monotonic() + max_wait
+        while True:
+            model = self.select_model(primary=primary, task=task)
+            if model is None:
+                with self.lock:
+                    ready_at = min(self.cooldowns.get(candidate, 0)
+                                   for candidate in self.candidate_models(primary, task))
+                if ready_at > give_up_at:
+                    print("All models are rate limited.")
+                    return None
+                wait = max(0.0, ready_at - time.monotonic())
+                print(f"All models are rate limited, waiting {wait:.1f}s...")
+                time.sleep(wait)
+                continue
+
+            limiter = self.limiter(model)
+            if limiter.acquire(token_estimate, max_wait=max(0.0, give_up_at - time.monotonic())):
+                return model
+            self.mark_rate_limited(model, limiter.wait_time(token_estimate))
+
+    def mark_rate_limited(self, model, delay):
+        with self.lock:
+            self.cooldowns[model] = max(self.cooldowns.get(model, 0), time.monotonic() + delay)
+        print(f"Model {model} rate limited, cooling down for {delay:.1f}s")
+
+    def rate_limit_delay(self, response, attempt):
+        """How long to leave a model alone after a 429/503, from Retry-After or the rate-limit headers."""
+        delay = parse_retry_after(response.headers.get("Retry-After"))
+        if delay is None:
+            resets = [
+                parse_duration(response.headers.get("x-ratelimit-reset-requests")),
+                parse_duration(response.headers.get("x-ratelimit-reset-tokens")),
+            ]
+            resets = [reset for reset in resets if reset]
+            delay = max(resets) if resets else None
+        if delay is None:
+            delay = self.backoff(attempt)
+        return min(delay, MAX_RATE_LIMIT_WAIT)
+
+    def backoff(self, attempt):
+        return min(8.0, 0.5 * 2 ** attempt) + random.uniform(0, 0.5)
+
+    def hedge_delay(self, model):
+        """Wait this long for ``model`` before hedging: its observed latency percentile once known."""
+        histogram = self.latency(model)
+        if histogram.count() < HEDGE_MIN_SAMPLES:
+            return HEDGE_DEFAULT_DELAY
+        return histogram.percentile(self.hedge_percentile)
+
+    def generate(self, prompt, task=None, deadline=None, **kwargs):
+        """Return the completion for ``prompt``.
+
+        ``task`` names the pipeline step ("headlines", "verdict"); with a
+        router configured it picks the model and receives the outcome.
+        Timeouts, retries and rate-limit waits all come out of ``deadline``
+        (a Deadline); once it runs out the fallback text is returned.
+        """
+        temperature = kwargs.get("temperature", 0.7)
+        max_tokens = min(kwargs.get("max_tokens", 500), 1000)
+        routed = self.router is not None and task is not None
+        model = self.router.choose(task, default=self.model_id) if routed else self.model_id
+        send = self._generate_hedged if self.hedge else self._generate
+
+        def compute():
+            start = time.perf_counter()
+            text, cacheable, answered_by = send(prompt, temperature, max_tokens, model, deadline, task=task)
+            annotate(cache="miss", model=answered_by or model, fallback=not cacheable)
+            if routed:
+                valid = cacheable and self.router.validate(task, text)
+                self.router.record(task, answered_by or model, time.perf_counter() - start, cacheable, valid)
+            return text, cacheable
+
+        with tracer.span(f"llm_{task or 'generate'}", model=model, prompt_chars=len(prompt)):
+            if self.cache is None:
+                return compute()[0]
+
+            annotate(cache="hit")
+            key = response_cache_key(model, prompt, temperature, max_tokens)
+            # A coalesced caller still only waits as long as its own deadline allows
+            wait_timeout = deadline.remaining() if deadline is not None and deadline.expires_at is not None else None
+            return self.cache.get_or_compute(key, compute, wait_timeout=wait_timeout,
+                                             on_timeout=lambda: self.coalesced_fallback(prompt))
+
+    def generate_stream(self, prompt, on_token, task=None, cancel=None, deadline=None, **kwargs):
+        """Stream a chat completion, calling ``on_token`` with each text delta; returns the full text.
+
+        If the stream fails before producing any text, this falls back to
+        ``generate`` (with its retries and backup models) and hands the
+        whole answer to ``on_token`` at once. Cancelling ``cancel`` closes
+        the stream and raises CheckCancelled. When ``deadline`` runs out
+        mid-stream the text received so far is returned.
+        """
+        cancel = cancel or CancelToken()
+        deadline = deadline or Deadline()
+        temperature = kwargs.get("temperature", 0.7)
+        max_tokens = min(kwargs.get("max_tokens", 500), 1000)
+        routed = self.router is not None and task is not None
+        model = self.router.choose(task, default=self.model_id) if routed else self.model_id
+        key = response_cache_key(model, prompt, temperature, max_tokens)
+
+        def fall_back():
+            text = self.generate(prompt, task=task, deadline=deadline, temperature=temperature, max_tokens=max_tokens)
+            on_token(text)
+            return text
 
-        while retry_count < max_retries:
-            headers = {
-                "Authorization": f"Bearer {self.api_key}",
-                "Content-Type": "application/json"
-            }
-
-            payload = {
-                "model": self.model_id,
-                "messages": [{"role": "user", "content": prompt}],
-                "temperature": kwargs.get("temperature", 0.7),
-                "max_tokens": min(kwargs.get("max_tokens", 500), 1000)
-            }
+        with tracer.span(f"llm_{task or 'generate'}", model=model, prompt_chars=len(prompt), stream=True):
+            return self._stream(prompt, on_token, task, model, key, temperature, max_tokens, cancel, deadline,
+                                fall_back)
+
+    def _stream(self, prompt, on_token, task, model, key, temperature, max_tokens, cancel, deadline, fall_back):
+        routed = self.router is not None and task is not None
+        if self.cache is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                annotate(cache="hit")
+                on_token(cached)
+                return cached
+            annotate(cache="miss")
+
+        if deadline.remaining() < MIN_CALL_BUDGET:
+            return fall_back()
+        selected = self.acquire_model(len(prompt) // 4 + max_tokens, model,
+                                      max_wait=deadline.timeout(MAX_RATE_LIMIT_WAIT), task=task)
+        if selected is None:
+            return fall_back()
+
+        payload = {
+            "model": selected,
+            "messages": [{"role": "user", "content": prompt}],
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+            "stream": True
+        }
 
-            try:
-                print(f"Sending request to Groq API ({self.model_id})...")
-                response = requests.post(self.api_url, headers=headers, json=payload, timeout=30)
-
-                if response.status_code == 200:
-                    result = response.json()
-                    if "choices" in result and result["choices"] and "message" in result["choices"][0]:
-                        return result["choices"][0]["message"]["content"].strip()
-                    else:
-                        return str(result)
-                else:
+        pieces = []
+        complete = False
+        usage = None
+        start = time.perf_counter()
+        try:
+            print(f"Streaming from Groq API ({selected})...")
+            timeout = deadline.timeout(REQUEST_TIMEOUT)
+            with self.session.post(self.api_url, json=payload, timeout=timeout, stream=True) as response:
+                self.limiter(selected).update_from_headers(response.headers)
+                if response.status_code != 200:
                     if response.status_code == 503 or response.status_code == 429:
-                        print(f"Service unavailable ({response.status_code}). Trying backup model...")
-                        if self.switch_to_backup_model():
-                            retry_count += 1
-                            time.sleep(2)
+                        self.mark_rate_limited(selected, self.rate_limit_delay(response, 1))
+                    raise RuntimeError(f"API returned status code {response.status_code}")
+
+                with cancel.on_cancel(response.close):
+                    for line in response.iter_lines(decode_unicode=True):
+                        cancel.raise_if_cancelled()
+                        if deadline.expired:
+                            print("Deadline reached, stopping the stream")
+                            break
+                        if not line or not line.startswith("data:"):
                             continue
-                        else:
-                            return self.fallback_generate(prompt)
-                    error_msg = f"Error: API returned status code {response.status_code}"
-                    print(error_msg)
-                    retry_count += 1
-                    time.sleep(2)
-            except Exception as e:
-                error_msg = f"Error calling Groq API: {str(e)}"
-                print(error_msg)
-                retry_count += 1
-                time.sleep(2)
+                        data = line[len("data:"):].strip()
+                        if data == "[DONE]":
+                            complete = True
+                            break
+                        chunk = json.loads(data)
+                        usage = chunk.get("usage") or (chunk.get("x_groq") or {}).get("usage") or usage
+                        choices = chunk.get("choices") or []
+                        delta = choices[0].get("delta", {}).get("content") if choices else None
+                        if delta:
+                            pieces.append(delta)
+                            on_token(delta)
+        except Exception as e:
+            cancel.raise_if_cancelled()
+            print(f"Error streaming from Groq API: {str(e)}")
+            if not pieces:
+                return fall_back()
+
+        text = "".join(pieces).strip()
+        elapsed = time.perf_counter() - start
+        annotate(model=selected, complete=complete, chars=len(text))
+        usage = usage or {}
+        add_counts(prompt_tokens=usage.get("prompt_tokens", len(prompt) // 4),
+                   completion_tokens=usage.get("completion_tokens", len(text) // 4))
+        if complete:
+            self.latency(selected).record(elapsed)
+            self.last_model = selected
+        if routed:
+            self.router.record(task, selected, elapsed, complete, complete and self.router.validate(task, text))
+        if self.cache is not None and complete and text:
+            self.cache.set(key, text)
+        return text
+
+    def _attempt(self, model, prompt, temperature, max_tokens, attempt, timeout=REQUEST_TIMEOUT):
+        """Send one request to ``model``.
+
+        Returns ``(outcome, text)`` where outcome is "ok", "bad_response",
+        "rate_limited" or "error".
+        """
+        payload = {
+            "model": model,
+            "messages": [{"role": "user", "content": prompt}],
+            "temperature": temperature,
+            "max_tokens": max_tokens
+        }
+
+        try:
+            print(f"Sending request to Groq API ({model})...")
+            start = time.perf_counter()
+            response = self.session.post(self.api_url, json=payload, timeout=timeout)
+            self.limiter(model).update_from_headers(response.headers)
+
+            if response.status_code == 200:
+                self.latency(model).record(time.perf_counter() - start)
+                self.last_model = model
+                result = response.json()
+                usage = result.get("usage") or {}
+                if "choices" in result and result["choices"] and "message" in result["choices"][0]:
+                    text = result["choices"][0]["message"]["content"].strip()
+                    add_counts(prompt_tokens=usage.get("prompt_tokens", len(prompt) // 4),
+                               completion_tokens=usage.get("completion_tokens", len(text) // 4))
+                    return "ok", text
+                else:
+                    return "bad_response", str(result)
 
+            if response.status_code == 503 or response.status_code == 429:
+                print(f"Service unavailable ({response.status_code}). Trying backup model...")
+                self.mark_rate_limited(model, self.rate_limit_delay(response, attempt))
+                return "rate_limited", None
+
+            print(f"Error: API returned status code {response.status_code}")
+            return "error", None
+        except Exception as e:
+            print(f"Error calling Groq API: {str(e)}")
+            return "error", None
+
+    def _generate(self, prompt, temperature, max_tokens, primary=None, deadline=None, task=None):
+        """Call the API; returns ``(text, cacheable, model)``, where fallback text is not cacheable."""
+        max_retries = 3
+        retry_count = 0
+        token_estimate = len(prompt) // 4 + max_tokens
+        deadline = deadline or Deadline()
+
+        while retry_count < max_retries:
+            if deadline.remaining() < MIN_CALL_BUDGET:
+                print("Deadline reached before the LLM answered")
+                break
+            model = self.acquire_model(token_estimate, primary, max_wait=deadline.timeout(MAX_RATE_LIMIT_WAIT),
+                                       task=task)
+            if model is None:
+                break
+
+            outcome, text = self._attempt(model, prompt, temperature, max_tokens, retry_count + 1,
+                                          timeout=deadline.timeout(REQUEST_TIMEOUT))
+            if outcome == "ok":
+                return text, True, model
+            if outcome == "bad_response":
+                return text, False, model
+
+            retry_count += 1
+            annotate(retries=retry_count)
+            if outcome == "error":
+                time.sleep(min(self.backoff(retry_count), deadline.remaining()))
+
+        return self.fallback_generate(prompt), False, None
+
+    def _generate_hedged(self, prompt, temperature, max_tokens, primary=None, deadline=None, task=None):
+        """Like ``_generate``, but re-send to a backup model if the first one is slow.
+
+        The first good answer wins. A loser that has not started yet is
+        skipped; one already in flight is abandoned and its answer dropped.
+        """
+        token_estimate = len(prompt) // 4 + max_tokens
+        deadline = deadline or Deadline()
+        requested = primary
+        primary = None
+        if deadline.remaining() >= MIN_CALL_BUDGET:
+            primary = self.acquire_model(token_estimate, requested, max_wait=deadline.timeout(MAX_RATE_LIMIT_WAIT),
+                                         task=task)
+        if primary is None:
+            return self.fallback_generate(prompt), False, None
+
+        outcomes = queue.Queue()
+        cancelled = threading.Event()
+
+        def run(model):
+            if not cancelled.is_set():
+                timeout = deadline.timeout(REQUEST_TIMEOUT)
+                outcomes.put((model, self._attempt(model, prompt, temperature, max_tokens, 1, timeout=timeout)))
+            else:
+                outcomes.put((model, ("cancelled", None)))
+
+        run = propagate(run)
+        _hedge_executor.submit(run, primary)
+        pending = 1
+        hedged = False
+        delay = self.hedge_delay(primary)
+        stop_at = time.monotonic() + deadline.timeout(REQUEST_TIMEOUT)
+
+        while pending:
+            timeout = delay if not hedged else stop_at - time.monotonic()
+            try:
+                model, (outcome, text) = outcomes.get(timeout=max(0.0, timeout))
+            except queue.Empty:
+                if hedged:
+                    break
+                hedged = True
+                backup = self.select_model(exclude=(primary,), primary=requested, task=task)
+                if backup and self.limiter(backup).acquire(token_estimate, max_wait=0):
+                    print(f"{primary} has not answered in {delay:.1f}s, hedging with {backup}...")
+                    _hedge_executor.submit(run, backup)
+                    pending += 1
+                continue
+
+            pending -= 1
+            if outcome == "ok":
+                cancelled.set()
+                annotate(hedged=hedged)
+                if hedged:
+                    print(f"Hedged request answered by {model}")
+                return text, True, model
+            if outcome == "bad_response" and not pending:
+                return text, False, model
+            if not hedged:
+                # The primary failed outright rather than being slow: use the normal retry path
+                break
+
+        cancelled.set()
+        return self._generate(prompt, temperature, max_tokens, requested, deadline, task=task)
+
+    def coalesced_fallback(self, prompt):
+        print("Deadline reached waiting for an identical in-flight request, using fallback")
+        annotate(fallback=True, cache="miss")
         return self.fallback_generate(prompt)
 
     def fallback_generate(self, prompt):
@@ -108,7 +507,24 @@ class GroqAPI:
         return "Could not generate response due to API limitations."
 
 
-def setup_driver():
+# URL patterns blocked in text-only mode: media, fonts and third-party trackers.
+# abs.twimg.com serves the app's JavaScript and must stay reachable.
+TEXT_ONLY_BLOCKED_URLS = [
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg", "*.ico",
+    "*.mp4", "*.m3u8", "*.m4s", "*.ts", "*.webm",
+    "*.woff", "*.woff2", "*.ttf", "*.otf",
+    "*pbs.twimg.com/*", "*video.twimg.com/*",
+    "*google-analytics.com/*", "*googletagmanager.com/*", "*doubleclick.net/*",
+    "*ads-twitter.com/*", "*ads-api.x.com/*", "*analytics.twitter.com/*", "*scribe.x.com/*",
+]
+
+TEXT_ONLY_MODE = os.environ.get("CHECKER_TEXT_ONLY", "0") == "1"
+
+# "dom" waits for the rendered tweetText element, "network" reads the GraphQL response
+EXTRACT_MODE = os.environ.get("CHECKER_EXTRACT_MODE", "dom")
+
+
+def setup_driver(text_only=False, capture_network=False):
     chrome_options = Options()
     chrome_options.add_argument("--headless")
     chrome_options.add_argument("--disable-gpu")
@@ -116,21 +532,70 @@ def setup_driver():
     chrome_options.add_argument("--disable-dev-shm-usage")
     chrome_options.add_argument("--window-size=1920,1080")
 
+    if text_only:
+        # Return from driver.get once the DOM is ready instead of waiting for every subresource
+        chrome_options.page_load_strategy = "eager"
+        chrome_options.add_argument("--blink-settings=imagesEnabled=false")
+        chrome_options.add_experimental_option("prefs", {
+            "profile.managed_default_content_settings.images": 2,
+        })
+
+    if capture_network:
+        # Performance logs carry the CDP Network events; "none" lets driver.get return immediately
+        chrome_options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+        chrome_options.page_load_strategy = "none"
+
     # driver = webdriver.Chrome(options=chrome_options)
 
-    ##ubuntus way
-    service = Service(ChromeDriverManager().install())
-    driver = webdriver.Chrome(service=service, options=chrome_options)
-    ####
+    with tracer.span("driver_startup", text_only=text_only, capture_network=capture_network):
+        ##ubuntus way
+        service = Service(chromedriver_path())
+        driver = webdriver.Chrome(service=service, options=chrome_options)
+        ####
+
+        if text_only:
+            enable_resource_blocking(driver)
     return driver
 
 
-def get_tweet_text(driver, url):
-    print(f"Navigating to {url}")
-    driver.get(url)
+def enable_resource_blocking(driver, blocked_urls=None):
+    """Block media, fonts and trackers through the DevTools Network domain."""
+    try:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": blocked_urls or TEXT_ONLY_BLOCKED_URLS})
+    except Exception as e:
+        print(f"Could not enable resource blocking: {str(e)}")
+
+
+def chromedriver_path():
+    """Resolve the chromedriver binary once instead of on every launch."""
+    global _chromedriver_path
+    if _chromedriver_path is None:
+        _chromedriver_path = ChromeDriverManager().install()
+    return _chromedriver_path
 
+
+def get_driver_pool():
+    """Return the process-wide warm driver pool, creating it on first use."""
+    global driver_pool
+    with _driver_pool_lock:
+        if driver_pool is None:
+            driver_pool = DriverPool(
+                lambda: setup_driver(text_only=TEXT_ONLY_MODE, capture_network=EXTRACT_MODE == "network"),
+                size=int(os.environ.get("DRIVER_POOL_SIZE", "2")),
+                max_pages=int(os.environ.get("DRIVER_POOL_MAX_PAGES", "50")),
+                max_rss_mb=int(os.environ.get("DRIVER_POOL_MAX_RSS_MB", "1024"))
+            )
+    return driver_pool
+
+
+def get_tweet_text(driver, url, navigate=True, timeout=TWEET_TIMEOUT):
     try:
-        wait = WebDriverWait(driver, 20)
+        if navigate:
+            print(f"Navigating to {url}")
+            driver.get(url)
+
+        wait = WebDriverWait(driver, timeout)
         tweet_element = wait.until(
             EC.presence_of_element_located((By.CSS_SELECTOR, '[data-testid="tweetText"]'))
         )
@@ -150,7 +615,134 @@ def get_tweet_text(driver, url):
         return None
 
 
-def generate_news_titles(llm, tweet_text):
+def capture_tweet_from_network(driver, url, timeout=10):
+    """Navigate to a status URL and return ``(details, navigated)``, the tweet parsed from the page's own
+    GraphQL response and whether the driver loaded ``url``.
+
+    Needs a driver created with ``capture_network=True``. ``details`` is None
+    when the payload does not arrive within ``timeout`` seconds.
+    """
+    status_id = tweet_status_id(url)
+    if not status_id:
+        return None, False
+
+    # Drop log entries left over from the previous page on a pooled driver
+    driver.get_log("performance")
+    print(f"Navigating to {url}")
+    driver.get(url)
+
+    pending = set()
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        for entry in driver.get_log("performance"):
+            message = json.loads(entry["message"]).get("message", {})
+            method = message.get("method")
+            params = message.get("params", {})
+
+            if method == "Network.responseReceived" and is_tweet_payload_url(params.get("response", {}).get("url")):
+                pending.add(params.get("requestId"))
+            elif method == "Network.loadingFinished" and params.get("requestId") in pending:
+                pending.discard(params["requestId"])
+                try:
+                    body = driver.execute_cdp_cmd("Network.getResponseBody", {"requestId": params["requestId"]})
+                    details = parse_tweet_payload(json.loads(body["body"]), status_id)
+                except Exception as e:
+                    print(f"Could not read tweet payload: {str(e)}")
+                    continue
+                if details:
+                    print("Tweet text found in network response!")
+                    return details, True
+        time.sleep(0.1)
+
+    print("Timeout waiting for tweet network response")
+    return None, True
+
+
+def get_tweet_details(driver, url, mode="dom", timeout=TWEET_TIMEOUT):
+    """Return a dict with the tweet's text and, in network mode, author, timestamp, quote and thread.
+
+    Page load, network capture and the DOM wait share ``timeout`` seconds.
+    Returns None for URLs without a status ID.
+    """
+    if not tweet_status_id(url):
+        print(f"Not a tweet URL: {url}")
+        return None
+
+    stop_at = time.monotonic() + timeout
+    driver.set_page_load_timeout(max(1.0, timeout))
+    navigate = True
+    if mode == "network":
+        try:
+            details, navigated = capture_tweet_from_network(driver, url, timeout=min(10, timeout))
+            if details:
+                return details
+            # Only reuse the page if the capture actually loaded it; a pooled driver still shows the last tweet
+            navigate = not navigated
+        except Exception as e:
+            print(f"Network capture unavailable, falling back to DOM: {str(e)}")
+
+    tweet_text = get_tweet_text(driver, url, navigate=navigate, timeout=max(0.0, stop_at - time.monotonic()))
+    if not tweet_text:
+        return None
+    return {
+        "text": tweet_text,
+        "author": None,
+        "author_name": None,
+        "created_at": None,
+        "quoted_tweet": None,
+        "thread": [],
+        "source": "dom",
+    }
+
+
+def fetch_tweet_details(tweet_url, driver=None, cache=None, mode=None, cancel=None, deadline=None):
+    """Return the tweet details, loading the page only when they are not cached.
+
+    Cancelling ``cancel`` quits the browser mid-load; the pool replaces it.
+    Waiting for a pooled driver and loading the page both come out of
+    ``deadline``.
+    """
+    cache = cache if cache is not None else tweet_cache
+    mode = mode or EXTRACT_MODE
+
+    details = cache.get(tweet_url)
+    if isinstance(details, str):
+        details = {"text": details, "source": "dom"}
+    if details:
+        print("Tweet text found in cache!")
+        annotate(cache="hit")
+        return details
+
+    annotate(cache="miss")
+    cancel = cancel or CancelToken()
+    deadline = deadline or Deadline()
+    if driver is None:
+        try:
+            pool = get_driver_pool()
+            with pool.driver(timeout=deadline.timeout(TWEET_TIMEOUT)) as pooled_driver, cancel.on_cancel(pooled_driver.quit):
+                with tracer.span("page_load", mode=mode):
+                    details = get_tweet_details(pooled_driver, tweet_url, mode=mode, timeout=deadline.timeout(TWEET_TIMEOUT))
+                    annotate(source=details["source"] if details else None)
+        except TimeoutError:
+            print("Deadline reached waiting for a browser")
+            details = None
+    else:
+        with cancel.on_cancel(driver.quit), tracer.span("page_load", mode=mode):
+            details = get_tweet_details(driver, tweet_url, mode=mode, timeout=deadline.timeout(TWEET_TIMEOUT))
+            annotate(source=details["source"] if details else None)
+    cancel.raise_if_cancelled()
+
+    cache.set(tweet_url, details)
+    return details
+
+
+def fetch_tweet_text(tweet_url, driver=None, cache=None):
+    """Return the tweet text, loading the page only when it is not cached."""
+    details = fetch_tweet_details(tweet_url, driver=driver, cache=cache)
+    return details["text"] if details else None
+
+
+def generate_news_titles(llm, tweet_text, deadline=None):
     prompt = f"""
     Generate 3 possible news headlines related to this tweet that would help fact-check it:
 
@@ -160,7 +752,7 @@ def generate_news_titles(llm, tweet_text):
     """
 
     print("Generating news headlines for fact-checking...")
-    response = llm.generate(prompt, temperature=0.3, max_tokens=150)
+    response = llm.generate(prompt, task="headlines", deadline=deadline, temperature=0.3, max_tokens=150)
 
     news_titles = [line.strip() for line in response.split('\n') if line.strip()]
 
@@ -182,177 +774,737 @@ def generate_news_titles(llm, tweet_text):
     return news_titles
 
 
-def search_duckduckgo(query):
-    try:
-        print(f"Searching DuckDuckGo for: {query}")
-        # Add freshness filter (last 24 hours) and news sources
-        modified_query = f"{query} after:2020-01-01"
-        with DDGS() as ddgs:
+def get_search_client():
+    """Return this thread's DDGS client, reusing its HTTP session across queries."""
+    client = getattr(_search_clients, "ddgs", None)
+    if client is None:
+        client = DDGS(timeout=SEARCH_TIMEOUT)
+        _search_clients.ddgs = client
+    return client
+
+
+def search_duckduckgo(query, ddgs=None):
+    with tracer.span("search", query=query) as span:
+        try:
+            print(f"Searching DuckDuckGo for: {query}")
+            # Add freshness filter (last 24 hours) and news sources
+            modified_query = f"{query} after:2020-01-01"
+            ddgs = ddgs or get_search_client()
             results = list(ddgs.text(modified_query, max_results=3))
+            span["results"] = len(results)
             return results
-    except Exception as e:
-        print(f"Error searching DuckDuckGo: {str(e)}")
-        return []
+        except Exception as e:
+            print(f"Error searching DuckDuckGo: {str(e)}")
+            span["error"] = type(e).__name__
+            return []
 
 
-def extract_article_content(url):
-    try:
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        }
-        response = requests.get(url, headers=headers, timeout=10)
+def search_headlines(queries, deadline=SEARCH_STAGE_DEADLINE, cancel=None, skipped=None):
+    """Search all headlines concurrently and merge the hits in headline order.
 
-        if response.status_code == 200:
-            soup = BeautifulSoup(response.text, 'html.parser')
+    Queries still running when ``deadline`` seconds have passed are dropped
+    so one slow search cannot stall the check; they are appended to
+    ``skipped`` when a list is given.
+    """
+    futures = {_search_executor.submit(propagate(search_duckduckgo), query): index for index, query in enumerate(queries)}
+    results_by_index = {}
+    pending = set(futures)
+    stop_at = time.monotonic() + deadline
+
+    while pending and time.monotonic() < stop_at:
+        if cancel is not None and cancel.cancelled:
+            for future in pending:
+                future.cancel()
+            raise CheckCancelled()
+        done, pending = wait(pending, timeout=min(0.2, max(0.0, stop_at - time.monotonic())),
+                             return_when=FIRST_COMPLETED)
+        for future in done:
+            results_by_index[futures[future]] = future.result()
+
+    if pending:
+        # Free the pool for other checks: queries that have not started yet never will
+        for future in pending:
+            future.cancel()
+        dropped = [queries[futures[future]] for future in pending]
+        print(f"Search stage deadline reached, skipping: {dropped}")
+        if skipped is not None:
+            skipped.extend(dropped)
+
+    merged = []
+    for index in range(len(queries)):
+        merged.extend(results_by_index.get(index, []))
+    return merged
+
+
+def size_fanout_executors(search_checks=1, article_checks=1):
+    """Size the shared search and article pools for that many checks searching / fetching at once.
+
+    Each check fans out up to SEARCH_WORKERS queries and ARTICLE_WORKERS
+    fetches; with pools smaller than that, concurrent checks queue behind
+    each other and the wait counts against their stage deadlines.
+    """
+    global _search_executor, _article_executor, _article_fanout, http_session
+    with _fanout_lock:
+        old_executors = [_search_executor, _article_executor]
+        _search_executor = ThreadPoolExecutor(max_workers=SEARCH_WORKERS * max(1, search_checks),
+                                              thread_name_prefix="search")
+        _article_fanout = ARTICLE_WORKERS * max(1, article_checks)
+        _article_executor = ThreadPoolExecutor(max_workers=_article_fanout, thread_name_prefix="article")
+    with _http_session_lock:
+        http_session = None
+    for executor in old_executors:
+        executor.shutdown(wait=False)
+
+
+def get_http_session():
+    """Return the shared keep-alive session used for article fetches."""
+    global http_session
+    with _http_session_lock:
+        if http_session is None:
+            http_session = requests.Session()
+            adapter = requests.adapters.HTTPAdapter(pool_connections=_article_fanout * 2, pool_maxsize=_article_fanout * 2)
+            http_session.mount("http://", adapter)
+            http_session.mount("https://", adapter)
+            http_session.headers.update({
+                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+            })
+    return http_session
+
+
+def fetch_article_html(url, max_bytes=ARTICLE_MAX_BYTES, timeout=ARTICLE_TIMEOUT, headers=None, cancel=None,
+                       deadline=None):
+    """Stream an HTML page, stopping after ``max_bytes``.
+
+    Returns a dict with ``html``, ``status``, ``bytes`` and the response's
+    ``etag`` / ``last_modified`` validators. ``html`` is None for non-200
+    or non-HTML responses, which are abandoned before the body is read.
+    If ``deadline`` runs out mid-body the partial page is returned with
+    status "truncated".
+    """
+    page = {"html": None, "status": None, "bytes": 0, "etag": None, "last_modified": None}
+    with get_http_session().get(url, timeout=timeout, stream=True, headers=headers) as response:
+        if response.status_code == 304:
+            page["status"] = "not modified"
+            return page
+        if response.status_code != 200:
+            page["status"] = f"status {response.status_code}"
+            return page
+
+        content_type = response.headers.get("Content-Type", "").lower()
+        if content_type and "html" not in content_type:
+            page["status"] = f"skipped {content_type.split(';')[0]}"
+            return page
+
+        chunks = []
+        size = 0
+        status = "ok"
+        with (cancel or CancelToken()).on_cancel(response.close):
+            for chunk in response.iter_content(chunk_size=16384):
+                if cancel is not None and cancel.cancelled:
+                    raise CheckCancelled()
+                if deadline is not None and deadline.expired:
+                    status = "truncated"
+                    break
+                chunks.append(chunk)
+                size += len(chunk)
+                if size >= max_bytes:
+                    break
+
+        encoding = response.encoding or "utf-8"
+        page.update(
+            html=b"".join(chunks)[:max_bytes].decode(encoding, errors="replace"),
+            status=status,
+            bytes=size,
+            etag=response.headers.get("ETag"),
+            last_modified=response.headers.get("Last-Modified"),
+        )
+        return page
 
-            for script in soup(["script", "style"]):
-                script.decompose()
 
-            paragraphs = soup.find_all('p')
-            text = ' '.join([p.get_text() for p in paragraphs])
+def parse_article_text(html, extractor=None):
+    with tracer.span("article_parse", html_chars=len(html)) as span:
+        text = get_extractor(extractor)(html)
+        span["chars"] = len(text) if text else 0
+        return text
 
-            text = re.sub(r'\s+', ' ', text).strip()
 
-            if len(text) > 2000:
-                text = text[:2000] + "..."
+def fetch_article(url, cache=None, cancel=None, deadline=None):
+    """Fetch and parse one article, returning its text with per-URL timing.
 
-            return text
+    Fresh cache entries skip the network; stale ones are revalidated with
+    If-None-Match / If-Modified-Since before being re-downloaded. With too
+    little of ``deadline`` left the fetch is skipped (status "deadline").
+    """
+    with tracer.span("article_fetch", url=url) as span:
+        article = _fetch_article(url, cache, cancel, deadline)
+        span.update(status=article["status"], bytes=article["bytes"], cache=article["cache"])
+    return article
+
+
+def _fetch_article(url, cache, cancel, deadline):
+    cache = cache if cache is not None else article_cache
+    start = time.perf_counter()
+    article = {"url": url, "content": None, "status": None, "bytes": 0, "elapsed": 0.0, "cache": "miss"}
+    try:
+        cached, fresh = cache.lookup(url)
+        if cached and fresh:
+            article.update(content=cached["text"], status="ok", cache="hit")
+            article["elapsed"] = round(time.perf_counter() - start, 3)
+            return article
+
+        deadline = deadline or Deadline()
+        if deadline.remaining() < MIN_CALL_BUDGET:
+            article["status"] = "deadline"
+            return article
+
+        headers = {}
+        if cached and cached["etag"]:
+            headers["If-None-Match"] = cached["etag"]
+        if cached and cached["last_modified"]:
+            headers["If-Modified-Since"] = cached["last_modified"]
+
+        page = fetch_article_html(url, timeout=deadline.timeout(ARTICLE_TIMEOUT), headers=headers or None,
+                                  cancel=cancel, deadline=deadline)
+        article.update(status=page["status"], bytes=page["bytes"])
+        if cached and page["status"] == "not modified":
+            cache.mark_revalidated(url)
+            article.update(content=cached["text"], status="ok", cache="revalidated")
+        elif page["html"]:
+            article["content"] = parse_article_text(page["html"])
+            if page["status"] == "ok":
+                cache.store(url, article["content"], etag=page["etag"], last_modified=page["last_modified"])
         else:
-            print(f"Failed to retrieve content from {url}. Status code: {response.status_code}")
-            return None
+            print(f"Failed to retrieve content from {url}: {article['status']}")
     except Exception as e:
-        print(f"Error extracting content from {url}: {str(e)}")
-        return None
+        if cancel is not None and cancel.cancelled:
+            article["status"] = "cancelled"
+        else:
+            article["status"] = f"error: {str(e)}"
+            print(f"Error extracting content from {url}: {str(e)}")
+    article["elapsed"] = round(time.perf_counter() - start, 3)
+    return article
+
+
+def extract_article_content(url):
+    return fetch_article(url)["content"]
+
+
+def extract_articles(urls, cancel=None, deadline=None):
+    """Fetch several articles concurrently over the shared session, keeping input order."""
+    fetch = propagate(lambda url: fetch_article(url, cancel=cancel, deadline=deadline))
+    articles = list(_article_executor.map(fetch, urls))
+    if cancel is not None:
+        cancel.raise_if_cancelled()
+    for article in articles:
+        print(f"Fetched {article['url']} in {article['elapsed']:.2f}s "
+              f"({article['bytes']} bytes, {article['status']}, cache {article['cache']})")
+    return articles
+
 
+def fallback_verdict(tweet_text, article_contents):
+    """Keyword-overlap verdict used when the LLM gives no usable answer or there is no time to ask it."""
+    print("Using fallback analysis...")
+    article_lower = article_contents.lower()
 
-def analyze_tweet_truthfulness(llm, tweet_text, article_contents):
+    important_keywords = [word.lower() for word in re.findall(r'\b[A-Z][a-z]+\b', tweet_text)]
+    found_keywords = [keyword for keyword in important_keywords if keyword in article_lower]
+
+    if len(found_keywords) >= len(important_keywords) * 0.7:
+        return "Based on the articles, the tweet appears to be PARTIALLY TRUE. Some key elements mentioned in the tweet are found in the news articles, but specific details may be exaggerated or not fully verified."
+    elif len(found_keywords) >= len(important_keywords) * 0.3:
+        return "Based on the articles, the tweet appears to be POTENTIALLY MISLEADING. While some elements match news reports, many specific claims cannot be verified from the gathered sources."
+    else:
+        return "Based on the articles, the tweet appears to be UNVERIFIED. Most specific claims made in the tweet are not substantiated by the gathered sources."
+
+
+def analyze_tweet_truthfulness(llm, tweet_text, article_contents, on_token=None, cancel=None, deadline=None,
+                               ask_confidence=False):
+    """Ask the LLM for a verdict on the tweet given the evidence text.
+
+    With ``ask_confidence`` the evidence is treated as search snippets and
+    the answer ends with "Confidence:" and "Sources agree:" lines, which
+    ``parse_confidence`` reads back.
+    """
+    if deadline is not None and deadline.remaining() < MIN_CALL_BUDGET:
+        print("No time left for the LLM verdict")
+        verdict = fallback_verdict(tweet_text, article_contents)
+        if on_token is not None:
+            on_token(verdict)
+        return verdict
+
+    evidence = fit_to_budget(article_contents, verdict_evidence_budget(llm))
     prompt = f"""
     Fact-check this tweet based on news articles:
 
     Tweet: "{tweet_text}"
 
-    Articles summary: {article_contents[:3000]}
+    Articles summary: {evidence}
+
+    Is the tweet true or false? Provide brief evidence.
+    """
+    if ask_confidence:
+        prompt = f"""
+    Fact-check this tweet based on news search results (titles and snippets only):
+
+    Tweet: "{tweet_text}"
+
+    Search results: {evidence}
 
     Is the tweet true or false? Provide brief evidence.
+    End with exactly these two lines:
+    Confidence: <0-100, how conclusive the search results are>
+    Sources agree: <yes or no>
     """
 
     print("Sending analysis request to LLM...")
-    response = llm.generate(
-        prompt,
-        temperature=0.1,
-        max_tokens=400
-    )
+    if on_token is not None:
+        response = llm.generate_stream(prompt, on_token, task="verdict", cancel=cancel, deadline=deadline,
+                                       temperature=0.1, max_tokens=400)
+    else:
+        response = llm.generate(
+            prompt,
+            task="verdict",
+            deadline=deadline,
+            temperature=0.1,
+            max_tokens=400
+        )
 
     if "error" in response.lower() or not response.strip():
-        print("Using fallback analysis...")
-        tweet_lower = tweet_text.lower()
-        article_lower = article_contents.lower()
+        return fallback_verdict(tweet_text, article_contents)
 
-        important_keywords = [word.lower() for word in re.findall(r'\b[A-Z][a-z]+\b', tweet_text)]
-        found_keywords = [keyword for keyword in important_keywords if keyword in article_lower]
+    return response
 
-        if len(found_keywords) >= len(important_keywords) * 0.7:
-            return "Based on the articles, the tweet appears to be PARTIALLY TRUE. Some key elements mentioned in the tweet are found in the news articles, but specific details may be exaggerated or not fully verified."
-        elif len(found_keywords) >= len(important_keywords) * 0.3:
-            return "Based on the articles, the tweet appears to be POTENTIALLY MISLEADING. While some elements match news reports, many specific claims cannot be verified from the gathered sources."
-        else:
-            return "Based on the articles, the tweet appears to be UNVERIFIED. Most specific claims made in the tweet are not substantiated by the gathered sources."
 
-    return response
+def verdict_evidence_budget(llm=None):
+    """Evidence token budget for the model the verdict call will go to.
+
+    That is the router's current pick for the task, or the client's own
+    model without a router; a rate-limit fallback reuses the same evidence.
+    """
+    model_id = llm.model_id if llm is not None else "llama3-8b-8192"
+    router = llm.router if llm is not None else model_router
+    if router is not None:
+        model_id = router.preferred("verdict", default=model_id)
+    return evidence_token_budget(model_id)
+
+
+# "Confidence: 85", "Confidence score: 85/100", "Confidence level: 85%", ...
+CONFIDENCE_SCORE = r'confidence(?:\s+(?:score|level|rating))?\W*(\d{1,3})(?:\s*(?:/|out of)\s*100)?\s*%?'
+CONFIDENCE_LINE = re.compile(r'^\W*(?:' + CONFIDENCE_SCORE + r'|confidence(?:\s+(?:score|level|rating))?'
+                             r'|sources agree\W*(?:yes|no)?)\W*$', re.IGNORECASE)
+CONFIDENCE_PREFIX = re.compile(r'^\W*' + CONFIDENCE_SCORE + r'[\s\-\u2013\u2014:;,.]*', re.IGNORECASE)
+CONFIDENCE_LABELS = ("confidence", "sources agree")
+
+
+def parse_confidence(text):
+    """Split a snippet-tier answer into ``(verdict, confidence, sources_agree)``; missing values are None."""
+    confidence = None
+    sources_agree = None
+    # The requested lines come last, so the last match wins over any mention in the evidence
+    scores = re.findall(CONFIDENCE_SCORE, text, re.IGNORECASE)
+    if scores:
+        confidence = min(100.0, float(scores[-1]))
+    answers = re.findall(r'sources agree\W*(yes|no)', text, re.IGNORECASE)
+    if answers:
+        sources_agree = answers[-1].lower() == "yes"
+    # Drop the bare "Confidence: 85" / "Sources agree: yes" lines, wherever the model put them, but keep
+    # any line that also carries the verdict, minus its leading score
+    lines = text.strip().splitlines()
+    while lines and (not lines[-1].strip() or CONFIDENCE_LINE.match(lines[-1])):
+        lines.pop()
+    while lines and (not lines[0].strip() or CONFIDENCE_LINE.match(lines[0])):
+        lines.pop(0)
+    verdict = CONFIDENCE_PREFIX.sub("", "\n".join(lines)).strip()
+    return verdict, confidence, sources_agree
+
+
+class ConfidenceHoldback:
+    """Pass a streamed snippet-tier answer on to ``on_token`` without its Confidence / Sources agree lines.
+
+    Text goes through as it arrives, except a line that starts like one of
+    those labels: it is held until it ends, then dropped if it only holds
+    the score, or passed on without its leading score if it also carries
+    the verdict. Line breaks are held until more text follows them.
+    """
+
+    def __init__(self, on_token):
+        self.on_token = on_token
+        self.line = ""
+        self.passing = False
+        self.newlines = ""
+        self.forwarded = False
+
+    def __call__(self, text):
+        for piece in re.split(r'(\n)', text):
+            if piece == "\n":
+                self.end_line()
+                self.newlines += "\n"
+            elif piece:
+                self.line += piece
+                if not self.passing:
+                    label = re.sub(r'^\W+', "", self.line).lower()
+                    self.passing = not any(name.startswith(label) or label.startswith(name)
+                                           for name in CONFIDENCE_LABELS)
+                if self.passing:
+                    self.forward(self.line)
+                    self.line = ""
+
+    def end_line(self):
+        if self.line and not CONFIDENCE_LINE.match(self.line):
+            self.forward(CONFIDENCE_PREFIX.sub("", self.line))
+        self.line = ""
+        self.passing = False
+
+    def forward(self, text):
+        if not text:
+            return
+        if self.forwarded:
+            text = self.newlines + text
+        self.newlines = ""
+        self.forwarded = True
+        self.on_token(text)
+
+
+def snippet_evidence(search_results):
+    return "\n".join(
+        f"Article title: {search_result.get('title', 'N/A')}\nDescription: {search_result.get('body', 'N/A')}"
+        for search_result in search_results)
+
+
+def valid_headlines_output(text):
+    lines = [line.strip() for line in text.split('\n') if line.strip()]
+    return len(lines) >= 2 and not any("error" in line.lower() for line in lines)
+
+
+def valid_verdict_output(text):
+    lower_text = text.lower()
+    return any(word in lower_text for word in ("true", "false", "misleading", "unverified", "accurate"))
+
+
+# Headlines are cheap, so they try the small instant model first; the verdict keeps the current model
+MODEL_POLICIES = {
+    "headlines": ModelPolicy(candidates=["llama-3.1-8b-instant", "llama3-8b-8192"], max_p95_latency=3.0),
+    "verdict": ModelPolicy(candidates=["llama3-8b-8192", "mixtral-8x7b-32768"], max_p95_latency=8.0),
+}
+
+model_router = ModelRouter(MODEL_POLICIES, validators={
+    "headlines": valid_headlines_output,
+    "verdict": valid_verdict_output,
+}) if os.environ.get("MODEL_ROUTING", "1") == "1" else None
+
+
+@dataclass
+class CheckResult:
+    tweet_url: str
+    tweet_text: str = None
+    tweet: dict = None
+    headlines: list = field(default_factory=list)
+    search_results: list = field(default_factory=list)
+    articles: list = field(default_factory=list)
+    evidence: str = None
+    verdict: str = None
+    error: str = None
+    cut_short: list = field(default_factory=list)
+    verdict_tier: str = None
+    confidence: float = None
+
+    def to_dict(self):
+        return asdict(self)
+
+
+PIPELINE_STAGES = ["tweet", "headlines", "search", "snippet_verdict", "articles", "verdict"]
+
+
+class StageFailed(Exception):
+    """A stage could not produce what the rest of the pipeline needs; ``result.error`` says why."""
+
+
+@contextmanager
+def pipeline_stage(name, on_stage=None, cancel=None):
+    """Wrap one pipeline stage: check for cancellation and report started/done/failed."""
+    if cancel is not None:
+        cancel.raise_if_cancelled()
+    if on_stage:
+        on_stage(name, "started")
+    try:
+        with tracer.span(f"stage_{name}"):
+            yield
+        if cancel is not None:
+            cancel.raise_if_cancelled()
+    except CheckCancelled:
+        if on_stage:
+            on_stage(name, "cancelled")
+        raise
+    except Exception:
+        if on_stage:
+            on_stage(name, "failed")
+        raise
+    if on_stage:
+        on_stage(name, "done")
+
+
+def check_tweet(tweet_url, llm=None, driver=None, on_verdict_token=None, on_stage=None, cancel=None, deadline=None,
+                tweet_text=None):
+    """Run the full fact-check pipeline for one tweet and return a CheckResult.
+
+    ``on_verdict_token`` receives the verdict text piece by piece as the LLM
+    streams it; it gets None when a streamed snippet-tier answer is set
+    aside for the article tier, before that verdict streams. ``on_stage(stage, status)`` is called as each of
+    PIPELINE_STAGES starts and finishes. Cancelling ``cancel`` (a
+    CancelToken) aborts in-flight browser and HTTP work and returns a
+    result with ``error == "Cancelled"``. Every stage takes its timeouts
+    from ``deadline`` (default: CHECK_DEADLINE seconds from now) and
+    degrades rather than overrunning it; degraded stages are listed in
+    ``result.cut_short``. Passing ``tweet_text`` checks that text without
+    loading the tweet. ``result.verdict_tier`` records whether the verdict
+    came from the search snippets alone or from the full articles; in the
+    first case the articles and verdict stages are reported as "skipped".
+    """
+    result = CheckResult(tweet_url=tweet_url, tweet_text=tweet_text)
+    deadline = deadline or Deadline(CHECK_DEADLINE)
+    result.cut_short = deadline.cut_short
+
+    if llm is None:
+        llm = GroqAPI(model_id="llama3-8b-8192", api_key=GROQ_API_KEY, cache=llm_response_cache,
+                      hedge=HEDGE_REQUESTS, router=model_router)
+
+    with tracer.trace(url=tweet_url), tracer.span("check", url=tweet_url) as span:
+        try:
+            _run_pipeline(result, llm, driver, on_verdict_token, on_stage, cancel, deadline)
+        except CheckCancelled:
+            print(f"Check of {tweet_url} cancelled")
+            result.error = "Cancelled"
+        except StageFailed:
+            pass
+        span.update(error=result.error, cut_short=list(result.cut_short))
+    return result
+
+
+def stage_tweet(result, driver=None, cancel=None, deadline=None):
+    if result.tweet_text:
+        return True
+    deadline = deadline or Deadline()
+    tweet = fetch_tweet_details(result.tweet_url, driver=driver, cancel=cancel, deadline=deadline)
+    tweet_text = tweet["text"] if tweet else None
+
+    if not tweet_text:
+        if deadline.expired:
+            deadline.cut("tweet")
+        result.error = "Failed to extract tweet text. Please check the URL and try again."
+        print(result.error)
+        return False
+
+    result.tweet_text = tweet_text
+    result.tweet = tweet
+    print("\nExtracted Tweet Text:")
+    print("-" * 80)
+    print(tweet_text)
+    print("-" * 80)
+    return True
+
+
+def stage_headlines(result, llm, deadline=None):
+    deadline = deadline or Deadline()
+    budget = deadline.sub(REQUEST_TIMEOUT, reserve=VERDICT_RESERVE + SEARCH_TIMEOUT)
+    news_titles = generate_news_titles(llm, result.tweet_text, deadline=budget)
+    if budget.expired:
+        deadline.cut("headlines")
+    result.headlines = news_titles
+
+    print("\nGenerated News Headlines for Search:")
+    for i, title in enumerate(news_titles, 1):
+        print(f"{i}. {title}")
+    print("-" * 80)
+    return True
+
+
+def stage_search(result, cancel=None, deadline=None):
+    deadline = deadline or Deadline()
+    skipped = []
+    all_search_results = search_headlines(result.headlines, cancel=cancel, skipped=skipped,
+                                          deadline=deadline.timeout(SEARCH_STAGE_DEADLINE, reserve=VERDICT_RESERVE))
+
+    # AMP, mobile and utm-tagged variants of one URL count as the same page
+    unique_results = dedupe_urls(all_search_results)
+
+    print("\nSearch Results:")
+    print("=" * 80)
+    if not unique_results:
+        print("No results found.")
+        key_terms = " ".join(re.findall(r'\b[A-Z][a-z]+\b', result.tweet_text))
+        if key_terms:
+            print(f"Trying search with key terms: {key_terms}")
+            results = search_headlines([key_terms], cancel=cancel, skipped=skipped,
+                                       deadline=deadline.timeout(SEARCH_TIMEOUT, reserve=VERDICT_RESERVE))
+            unique_results.extend(dedupe_urls(results))
+
+    if skipped:
+        deadline.cut("search")
+    # Best first: relevance to the tweet plus source quality, not arrival order. Syndicated
+    # copies of one story are then collapsed so only the best-ranked copy is fetched.
+    result.search_results = collapse_near_duplicates(rank_hits(result.tweet_text, unique_results))
+    if not unique_results:
+        result.error = "No search results found."
+        return False
+
+    for i, search_result in enumerate(result.search_results[:3], 1):
+        print(f"Result {i} (score {search_result['score']:.2f}):")
+        print(f"Title: {search_result.get('title', 'N/A')}")
+        print(f"URL: {search_result.get('href', 'N/A')}")
+        print(f"Description: {search_result.get('body', 'N/A')}")
+        print("-" * 80)
+    return True
+
+
+def stage_snippet_verdict(result, llm, on_verdict_token=None, cancel=None, deadline=None):
+    """First verdict tier: judge the tweet from search titles and snippets alone.
+
+    The answer is kept, and the article fetch skipped, when the LLM's
+    confidence reaches VERDICT_CONFIDENCE_THRESHOLD and it does not report
+    the sources disagreeing, or when there is no time left for a second tier.
+    """
+    if not TWO_TIER_VERDICT:
+        return True
+    print("\nChecking the tweet against search snippets...")
+    deadline = deadline or Deadline()
+    evidence = snippet_evidence(result.search_results[:SNIPPET_EVIDENCE_COUNT])
+    holdback = ConfidenceHoldback(on_verdict_token) if on_verdict_token is not None else None
+    response = analyze_tweet_truthfulness(llm, result.tweet_text, evidence, on_token=holdback, cancel=cancel,
+                                          deadline=deadline.sub(REQUEST_TIMEOUT, reserve=VERDICT_RESERVE),
+                                          ask_confidence=True)
+    if holdback is not None:
+        holdback.end_line()
+    verdict, confidence, sources_agree = parse_confidence(response)
+    result.confidence = confidence
+
+    keep = False
+    if not verdict:
+        print("Snippet check gave no verdict, reading full articles")
+    elif confidence is None:
+        print("No confidence score from the snippet check, reading full articles")
+    elif confidence >= VERDICT_CONFIDENCE_THRESHOLD and sources_agree is not False:
+        keep = True
+    elif deadline.remaining() >= VERDICT_RESERVE + MIN_CALL_BUDGET:
+        print(f"Snippet check not conclusive (confidence {confidence:.0f}, sources agree: {sources_agree}), "
+              "reading full articles")
+    else:
+        deadline.cut("articles")
+        keep = True
+
+    if not keep:
+        # Take back the streamed snippet answer; the article tier streams its own
+        if holdback is not None and holdback.forwarded:
+            on_verdict_token(None)
+        return True
+
+    print(f"Verdict decided from snippets (confidence {confidence:.0f})")
+    result.verdict = verdict
+    result.verdict_tier = "snippets"
+    result.evidence = evidence
+    return True
+
+
+def stage_articles(result, llm=None, cancel=None, deadline=None):
+    """Fetch the top-ranked articles; when time is short, fall back to the search snippets.
+
+    Only the leading hits are fetched, fewer when the ranking scores drop
+    off sharply after the first ones. Skipped once the snippet tier decided.
+    """
+    if result.verdict_tier == "snippets":
+        return True
+    print("\nExtracting content from news articles...")
+    deadline = deadline or Deadline()
+    article_contents = []
+
+    candidates = [search_result for search_result in result.search_results if search_result.get('href')]
+    selected = adaptive_top_k(candidates, max_k=ARTICLE_MAX_FETCH)
+    for i, search_result in enumerate(selected, 1):
+        print(f"Processing article {i}: {search_result['href']}")
+
+    budget = deadline.sub(ARTICLE_TIMEOUT, reserve=VERDICT_RESERVE)
+    fetched = extract_articles([search_result['href'] for search_result in selected], cancel=cancel, deadline=budget)
+    if any(article["status"] in ("deadline", "truncated") for article in fetched):
+        deadline.cut("articles")
+    # Keep the sentences most relevant to the tweet, across all articles, within the model's budget,
+    # leaving room for the "Article i: " labels and line breaks added below
+    labels = sum(estimate_tokens(f"Article {i}: \n") for i in range(1, len(fetched) + 1))
+    excerpts = pack_evidence(result.tweet_text, [article["content"] or "" for article in fetched],
+                             max(0, verdict_evidence_budget(llm) - labels - 1))
+    for i, (search_result, article, excerpt) in enumerate(zip(selected, fetched, excerpts), 1):
+        if article["content"]:
+            article.update(title=search_result.get('title'), content=excerpt)
+            result.articles.append(article)
+        if excerpt:
+            article_contents.append(f"Article {i}: {excerpt}")
+
+    if not article_contents:
+        print("Could not extract content from any articles.")
+        article_contents = [snippet_evidence(result.search_results[:3])]
+
+    result.evidence = "\n".join(article_contents)
+    return True
+
+
+def stage_verdict(result, llm, on_verdict_token=None, cancel=None, deadline=None):
+    if result.verdict_tier == "snippets":
+        return True
+    print("\nAnalyzing tweet truthfulness...")
+    deadline = deadline or Deadline()
+    if deadline.remaining() < MIN_CALL_BUDGET:
+        deadline.cut("verdict")
+    result.verdict = analyze_tweet_truthfulness(llm, result.tweet_text, result.evidence,
+                                                on_token=on_verdict_token, cancel=cancel, deadline=deadline)
+    if deadline.expired:
+        deadline.cut("verdict")
+    result.verdict_tier = "articles"
+    return True
+
+
+def _run_pipeline(result, llm, driver, on_verdict_token, on_stage, cancel, deadline):
+    with pipeline_stage("tweet", on_stage, cancel):
+        if not stage_tweet(result, driver=driver, cancel=cancel, deadline=deadline):
+            raise StageFailed()
+    with pipeline_stage("headlines", on_stage, cancel):
+        stage_headlines(result, llm, deadline=deadline)
+    with pipeline_stage("search", on_stage, cancel):
+        if not stage_search(result, cancel=cancel, deadline=deadline):
+            raise StageFailed()
+    with pipeline_stage("snippet_verdict", on_stage, cancel):
+        stage_snippet_verdict(result, llm, on_verdict_token=on_verdict_token, cancel=cancel, deadline=deadline)
+    if result.verdict_tier == "snippets":
+        for name in ("articles", "verdict"):
+            if on_stage:
+                on_stage(name, "skipped")
+        return
+    with pipeline_stage("articles", on_stage, cancel):
+        stage_articles(result, llm, cancel=cancel, deadline=deadline)
+    with pipeline_stage("verdict", on_stage, cancel):
+        stage_verdict(result, llm, on_verdict_token=on_verdict_token, cancel=cancel, deadline=deadline)
 
 
 def main():
     print("Initializing Groq API client...")
-    llm = GroqAPI(model_id="llama3-8b-8192", api_key=GROQ_API_KEY)
+    llm = GroqAPI(model_id="llama3-8b-8192", api_key=GROQ_API_KEY, cache=llm_response_cache,
+                  hedge=HEDGE_REQUESTS, router=model_router)
 
     tweet_url = input("Enter the Twitter/X post URL (e.g., https://x.com/username/status/123456): ")
 
-    driver = setup_driver()
+    result = check_tweet(tweet_url, llm=llm)
 
-    try:
-        tweet_text = get_tweet_text(driver, tweet_url)
-
-        if tweet_text:
-            print("\nExtracted Tweet Text:")
-            print("-" * 80)
-            print(tweet_text)
-            print("-" * 80)
-
-            news_titles = generate_news_titles(llm, tweet_text)
-
-            print("\nGenerated News Headlines for Search:")
-            for i, title in enumerate(news_titles, 1):
-                print(f"{i}. {title}")
-            print("-" * 80)
-
-            all_search_results = []
-            for title in news_titles:
-                results = search_duckduckgo(title)
-                all_search_results.extend(results)
-
-            unique_results = []
-            seen_urls = set()
-            for result in all_search_results:
-                url = result.get('href')
-                if url and url not in seen_urls:
-                    seen_urls.add(url)
-                    unique_results.append(result)
-
-            print("\nSearch Results:")
-            print("=" * 80)
-            if not unique_results:
-                print("No results found.")
-                key_terms = " ".join(re.findall(r'\b[A-Z][a-z]+\b', tweet_text))
-                if key_terms:
-                    print(f"Trying search with key terms: {key_terms}")
-                    results = search_duckduckgo(key_terms)
-                    unique_results.extend(results)
-
-                if not unique_results:
-                    return
-
-            for i, result in enumerate(unique_results[:3], 1):
-                print(f"Result {i}:")
-                print(f"Title: {result.get('title', 'N/A')}")
-                print(f"URL: {result.get('href', 'N/A')}")
-                print(f"Description: {result.get('body', 'N/A')}")
-                print("-" * 80)
-
-            print("\nExtracting content from news articles...")
-            article_contents = []
-
-            for i, result in enumerate(unique_results[:3], 1):
-                url = result.get('href')
-                if url:
-                    print(f"Processing article {i}: {url}")
-                    content = extract_article_content(url)
-                    if content:
-                        summary = content[:600] + "..." if len(content) > 600 else content
-                        article_contents.append(f"Article {i}: {summary}")
-
-            if not article_contents:
-                print("Could not extract content from any articles.")
-                article_contents = [
-                    f"Article title: {result.get('title', 'N/A')}\nDescription: {result.get('body', 'N/A')}"
-                    for result in unique_results[:3]]
-                if not article_contents:
-                    return
-
-            all_article_text = " ".join(article_contents)
-
-            print("\nAnalyzing tweet truthfulness...")
-            analysis = analyze_tweet_truthfulness(llm, tweet_text, all_article_text)
-
-            print("\nFactual Analysis:")
-            print("=" * 80)
-            print(analysis)
-            print("=" * 80)
-        else:
-            print("Failed to extract tweet text. Please check the URL and try again.")
+    if result.verdict:
+        print("\nFactual Analysis:")
+        print("=" * 80)
+        print(result.verdict)
+        print("=" * 80)
+    if result.verdict_tier:
+        print(f"Decided from: {result.verdict_tier}")
+    if result.cut_short:
+        print(f"Cut short by the {CHECK_DEADLINE:.0f}s deadline: {', '.join(result.cut_short)}")
 
-    finally:
-        driver.quit()
+    stats = article_cache.stats()
+    print(f"Article cache: {stats['hits']} hits, {stats['misses']} misses, "
+          f"{stats['revalidated']} revalidated, {stats['entries']} entries")
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
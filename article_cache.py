@@ -0,0 +1,137 @@
+import os
+import sqlite3
+import threading
+import time
+
+from article_extractors import TEXT_VERSION
+from url_canon import canonicalize_url
+
+DEFAULT_CACHE_PATH = os.path.join(os.environ.get("CHECKER_CACHE_DIR", ".cache"), "articles.sqlite3")
+DEFAULT_TTL = 24 * 60 * 60
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+
+def cache_key(url):
+    """Canonical form of an article URL used as the cache key, so AMP, mobile and tracked links share an entry."""
+    return canonicalize_url(url)
+
+
+class ArticleCache:
+    """SQLite-backed URL -> extracted article text cache.
+
+    Entries younger than ``ttl`` are served directly. Older entries keep
+    their ETag / Last-Modified so the fetcher can revalidate them with a
+    conditional request. Once the stored text exceeds ``max_bytes`` the
+    least recently used entries are evicted. Entries stored under another
+    ``version`` (an older extractor or character budget) count as misses.
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, ttl=DEFAULT_TTL, max_bytes=DEFAULT_MAX_BYTES, version=TEXT_VERSION):
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.version = version
+        self.lock = threading.Lock()
+        self.counters = {"hits": 0, "misses": 0, "stale": 0, "revalidated": 0, "stores": 0, "evictions": 0}
+        self.conn = None
+
+    def _connect(self):
+        if self.conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self.conn = sqlite3.connect(self.path, check_same_thread=False)
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS articles (
+                    url TEXT PRIMARY KEY,
+                    text TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    etag TEXT,
+                    last_modified TEXT,
+                    fetched_at REAL NOT NULL,
+                    last_access REAL NOT NULL
+                )
+            """)
+            self.conn.execute("CREATE INDEX IF NOT EXISTS articles_last_access ON articles (last_access)")
+            columns = [row[1] for row in self.conn.execute("PRAGMA table_info(articles)")]
+            if "version" not in columns:
+                # Caches from before versioning: their rows read as NULL, i.e. outdated
+                self.conn.execute("ALTER TABLE articles ADD COLUMN version TEXT")
+            self.conn.commit()
+        return self.conn
+
+    def lookup(self, url):
+        """Return ``(entry, fresh)``; ``entry`` is None on a miss."""
+        key = cache_key(url)
+        now = time.time()
+        with self.lock:
+            conn = self._connect()
+            row = conn.execute(
+                "SELECT text, etag, last_modified, fetched_at, version FROM articles WHERE url = ?", (key,)
+            ).fetchone()
+            if row is not None and row[4] != self.version:
+                # Extracted by an older version: never serve or revalidate it
+                conn.execute("DELETE FROM articles WHERE url = ?", (key,))
+                conn.commit()
+                row = None
+            if row is None:
+                self.counters["misses"] += 1
+                return None, False
+
+            conn.execute("UPDATE articles SET last_access = ? WHERE url = ?", (now, key))
+            conn.commit()
+            entry = {"text": row[0], "etag": row[1], "last_modified": row[2], "fetched_at": row[3]}
+            fresh = now - entry["fetched_at"] <= self.ttl
+            self.counters["hits" if fresh else "stale"] += 1
+            return entry, fresh
+
+    def store(self, url, text, etag=None, last_modified=None):
+        if not text:
+            return
+        key = cache_key(url)
+        now = time.time()
+        with self.lock:
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO articles "
+                "(url, text, size, etag, last_modified, fetched_at, last_access, version) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, text, len(text.encode("utf-8")), etag, last_modified, now, now, self.version)
+            )
+            self.counters["stores"] += 1
+            self._evict(conn)
+            conn.commit()
+
+    def mark_revalidated(self, url):
+        """Record a 304 Not Modified: the stored text is fresh again."""
+        now = time.time()
+        with self.lock:
+            conn = self._connect()
+            conn.execute(
+                "UPDATE articles SET fetched_at = ?, last_access = ? WHERE url = ?", (now, now, cache_key(url))
+            )
+            conn.commit()
+            self.counters["revalidated"] += 1
+
+    def _evict(self, conn):
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM articles").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for url, size in conn.execute("SELECT url, size FROM articles ORDER BY last_access ASC").fetchall():
+            if total <= self.max_bytes:
+                break
+            conn.execute("DELETE FROM articles WHERE url = ?", (url,))
+            total -= size
+            self.counters["evictions"] += 1
+
+    def stats(self):
+        with self.lock:
+            conn = self._connect()
+            entries, size = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM articles").fetchone()
+            return dict(self.counters, entries=entries, bytes=size)
+
+    def close(self):
+        with self.lock:
+            if self.conn is not None:
+                self.conn.close()
+                self.conn = None
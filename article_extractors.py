@@ -0,0 +1,87 @@
+import os
+import re
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+try:
+    from lxml import etree
+except ImportError:
+    etree = None
+
+# Bounds parse work only; context_packing picks the sentences that reach the prompt
+ARTICLE_CHAR_BUDGET = 12000
+# Stored with each cached article; change it whenever extraction output changes so old texts are re-extracted
+TEXT_VERSION = f"paragraphs-{ARTICLE_CHAR_BUDGET}"
+
+
+def _finish(pieces, budget):
+    text = ' '.join(pieces)
+    text = re.sub(r'\s+', ' ', text).strip()
+
+    if len(text) > budget:
+        text = text[:budget] + "..."
+
+    return text
+
+
+def extract_paragraphs_reference(html, budget=ARTICLE_CHAR_BUDGET):
+    """Original behaviour: full html.parser tree, drop script/style, join every <p>."""
+    soup = BeautifulSoup(html, 'html.parser')
+
+    for script in soup(["script", "style"]):
+        script.decompose()
+
+    paragraphs = soup.find_all('p')
+    return _finish([p.get_text() for p in paragraphs], budget)
+
+
+def extract_paragraphs_strainer(html, budget=ARTICLE_CHAR_BUDGET):
+    """BeautifulSoup on lxml, building only the <p> subtrees."""
+    soup = BeautifulSoup(html, 'lxml' if etree is not None else 'html.parser', parse_only=SoupStrainer('p'))
+
+    for script in soup(["script", "style"]):
+        script.decompose()
+
+    return _finish([p.get_text() for p in soup.find_all('p')], budget)
+
+
+def extract_paragraphs_lxml(html, budget=ARTICLE_CHAR_BUDGET, chunk_size=16384):
+    """Incremental lxml parse that stops feeding input once the budget is collected."""
+    parser = etree.HTMLPullParser(events=("end",), tag="p")
+    pieces = []
+    collected = 0
+
+    for offset in range(0, len(html), chunk_size):
+        parser.feed(html[offset:offset + chunk_size])
+        for _, element in parser.read_events():
+            text = "".join(element.xpath(".//text()[not(ancestor::script) and not(ancestor::style)]"))
+            pieces.append(text)
+            collected += len(re.sub(r'\s+', ' ', text).strip()) + 1
+            element.clear(keep_tail=True)
+        if collected > budget:
+            return _finish(pieces, budget)
+
+    try:
+        parser.close()
+    except etree.LxmlError:
+        pass
+    for _, element in parser.read_events():
+        pieces.append("".join(element.xpath(".//text()[not(ancestor::script) and not(ancestor::style)]")))
+    return _finish(pieces, budget)
+
+
+EXTRACTORS = {
+    "reference": extract_paragraphs_reference,
+    "strainer": extract_paragraphs_strainer,
+}
+if etree is not None:
+    EXTRACTORS["lxml"] = extract_paragraphs_lxml
+
+DEFAULT_EXTRACTOR = os.environ.get("ARTICLE_EXTRACTOR", "lxml" if etree is not None else "reference")
+
+
+def get_extractor(name=None):
+    name = name or DEFAULT_EXTRACTOR
+    if name not in EXTRACTORS:
+        raise ValueError(f"Unknown article extractor: {name} (available: {', '.join(EXTRACTORS)})")
+    return EXTRACTORS[name]
@@ -0,0 +1,183 @@
+"""Batch fact-check: run many tweet URLs through a staged, concurrent pipeline.
+
+Usage:
+    python batch_check.py urls.txt [-o results.jsonl]
+    cat urls.jsonl | python batch_check.py - > results.jsonl
+
+Input is one URL per line, a CSV with a ``url`` column (or URLs in the
+first column), or JSONL objects with a ``url`` key. Each pipeline stage has
+its own bounded worker pool, so different tweets overlap: one tweet's
+verdict is written while the next one's articles are fetched. Results are
+written as JSONL in completion order, each carrying its input ``index``.
+Each tweet gets CHECK_DEADLINE seconds end to end, counted from when it
+enters the pipeline.
+"""
+import argparse
+import contextlib
+import csv
+import io
+import json
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from deadline import Deadline
+from tracing import tracer
+from Twitter_post_checker import (
+    GroqAPI, GROQ_API_KEY, HEDGE_REQUESTS, CHECK_DEADLINE, CheckResult, get_driver_pool, llm_response_cache,
+    model_router, size_fanout_executors, stage_tweet, stage_headlines, stage_search, stage_snippet_verdict,
+    stage_articles, stage_verdict,
+)
+
+DEFAULT_WORKERS = {"tweet": 2, "headlines": 4, "search": 4, "snippet_verdict": 4, "articles": 4, "verdict": 4}
+
+
+def read_urls(stream, name=""):
+    """Yield tweet URLs from plain text, CSV or JSONL input."""
+    lines = [line for line in stream.read().splitlines() if line.strip() and not line.lstrip().startswith("#")]
+    if not lines:
+        return
+
+    first = lines[0].strip()
+    if name.endswith(".jsonl") or first.startswith("{"):
+        for line in lines:
+            url = json.loads(line).get("url")
+            if url:
+                yield url.strip()
+    elif name.endswith(".csv") or "," in first:
+        rows = list(csv.reader(io.StringIO("\n".join(lines))))
+        header = [column.strip().lower() for column in rows[0]]
+        column = header.index("url") if "url" in header else 0
+        for row in rows[1:] if "url" in header else rows:
+            if len(row) > column and row[column].strip():
+                yield row[column].strip()
+    else:
+        for line in lines:
+            yield line.strip()
+
+
+class BatchRunner:
+    """Push tweets through per-stage worker pools, at most ``max_in_flight`` at a time."""
+
+    def __init__(self, llm, write, workers=None, max_in_flight=None):
+        workers = dict(DEFAULT_WORKERS, **(workers or {}))
+        self.stages = [
+            ("tweet", lambda result, deadline: stage_tweet(result, deadline=deadline)),
+            ("headlines", lambda result, deadline: stage_headlines(result, llm, deadline=deadline)),
+            ("search", lambda result, deadline: stage_search(result, deadline=deadline)),
+            ("snippet_verdict", lambda result, deadline: stage_snippet_verdict(result, llm, deadline=deadline)),
+            ("articles", lambda result, deadline: stage_articles(result, llm, deadline=deadline)),
+            ("verdict", lambda result, deadline: stage_verdict(result, llm, deadline=deadline)),
+        ]
+        self.executors = {
+            name: ThreadPoolExecutor(max_workers=workers[name], thread_name_prefix=f"batch-{name}")
+            for name, _ in self.stages
+        }
+        # Every search / articles worker fans out its own queries and fetches
+        size_fanout_executors(search_checks=workers["search"], article_checks=workers["articles"])
+        self.slots = threading.BoundedSemaphore(max_in_flight or sum(workers.values()))
+        self.write = write
+        self.condition = threading.Condition()
+        self.submitted = 0
+        self.completed = 0
+
+    def submit(self, index, tweet_url):
+        self.slots.acquire()
+        with self.condition:
+            self.submitted += 1
+        deadline = Deadline(CHECK_DEADLINE)
+        item = {"index": index, "result": CheckResult(tweet_url=tweet_url, cut_short=deadline.cut_short),
+                "deadline": deadline, "trace_id": uuid.uuid4().hex, "started": time.perf_counter(), "stage_times": {}}
+        self._advance(item, 0)
+
+    def _advance(self, item, stage_index):
+        if stage_index == len(self.stages):
+            self._finish(item)
+            return
+        name, run = self.stages[stage_index]
+        future = self.executors[name].submit(self._run_stage, item, name, run)
+        future.add_done_callback(
+            lambda done: self._advance(item, stage_index + 1) if done.result() else self._finish(item)
+        )
+
+    def _run_stage(self, item, name, run):
+        start = time.perf_counter()
+        try:
+            with tracer.trace(item["trace_id"], url=item["result"].tweet_url), tracer.span(f"stage_{name}"):
+                return run(item["result"], item["deadline"])
+        except Exception as e:
+            item["result"].error = f"{name} stage failed: {str(e)}"
+            return False
+        finally:
+            item["stage_times"][name] = round(time.perf_counter() - start, 3)
+
+    def _finish(self, item):
+        record = {"index": item["index"]}
+        record.update(item["result"].to_dict())
+        record["elapsed"] = round(time.perf_counter() - item["started"], 3)
+        record["stage_times"] = item["stage_times"]
+        try:
+            self.write(record)
+        finally:
+            self.slots.release()
+            with self.condition:
+                self.completed += 1
+                self.condition.notify_all()
+
+    def wait(self):
+        with self.condition:
+            while self.completed < self.submitted:
+                self.condition.wait()
+        for executor in self.executors.values():
+            executor.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fact-check a list of tweet URLs.")
+    parser.add_argument("input", help="file with tweet URLs (text, CSV or JSONL), or - for stdin")
+    parser.add_argument("-o", "--output", default="-", help="JSONL output file (default: stdout)")
+    for name, count in DEFAULT_WORKERS.items():
+        parser.add_argument(f"--{name.replace('_', '-')}-workers", type=int, default=count)
+    parser.add_argument("--max-in-flight", type=int, default=None)
+    args = parser.parse_args()
+
+    if args.input == "-":
+        urls = list(read_urls(sys.stdin))
+    else:
+        with open(args.input, "r") as f:
+            urls = list(read_urls(f, args.input))
+
+    output = sys.stdout if args.output == "-" else open(args.output, "w")
+    write_lock = threading.Lock()
+
+    def write(record):
+        with write_lock:
+            output.write(json.dumps(record) + "\n")
+            output.flush()
+
+    workers = {name: getattr(args, f"{name}_workers") for name in DEFAULT_WORKERS}
+    llm = GroqAPI(model_id="llama3-8b-8192", api_key=GROQ_API_KEY, cache=llm_response_cache,
+                  hedge=HEDGE_REQUESTS, router=model_router)
+
+    start = time.perf_counter()
+    # Progress output from the pipeline goes to stderr so stdout stays valid JSONL
+    with contextlib.redirect_stdout(sys.stderr):
+        pool = get_driver_pool()
+        pool.size = max(pool.size, workers["tweet"])
+        pool.warm(workers["tweet"])
+        runner = BatchRunner(llm, write, workers=workers, max_in_flight=args.max_in_flight)
+        for index, tweet_url in enumerate(urls):
+            runner.submit(index, tweet_url)
+        runner.wait()
+    elapsed = time.perf_counter() - start
+
+    if output is not sys.stdout:
+        output.close()
+    rate = len(urls) / elapsed * 60 if elapsed else 0.0
+    print(f"Checked {len(urls)} tweets in {elapsed:.1f}s ({rate:.1f} tweets/minute)", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""Micro-benchmark the article paragraph extractors over saved news HTML.
+
+Usage:
+    python -m benchmarks.article_extract [corpus_dir] [--rounds N]
+
+``corpus_dir`` holds news pages saved as ``.html`` files. Every extractor
+in ``article_extractors.EXTRACTORS`` is timed on the whole corpus and its
+output is compared with the reference implementation.
+"""
+import argparse
+import os
+import time
+
+from article_extractors import EXTRACTORS, extract_paragraphs_reference
+
+
+def load_corpus(directory):
+    corpus = []
+    for name in sorted(os.listdir(directory)):
+        if name.endswith((".html", ".htm")):
+            with open(os.path.join(directory, name), "r", encoding="utf-8", errors="replace") as f:
+                corpus.append((name, f.read()))
+    return corpus
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("corpus_dir", nargs="?", default=os.path.join(os.path.dirname(__file__), "articles"))
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.corpus_dir):
+        print(f"Corpus directory not found: {args.corpus_dir}")
+        return
+
+    corpus = load_corpus(args.corpus_dir)
+    if not corpus:
+        print(f"No saved HTML found in {args.corpus_dir}")
+        return
+
+    total_bytes = sum(len(html.encode("utf-8")) for _, html in corpus)
+    expected = {name: extract_paragraphs_reference(html) for name, html in corpus}
+
+    print(f"\nArticle extractor benchmark: {len(corpus)} pages, {total_bytes / 1e6:.1f} MB, {args.rounds} rounds")
+    print("=" * 80)
+    print(f"{'extractor':<12}{'pages/s':>12}{'MB/s':>10}{'speedup':>10}{'matches':>10}")
+
+    baseline = None
+    for name, extractor in EXTRACTORS.items():
+        start = time.perf_counter()
+        for _ in range(args.rounds):
+            outputs = {page: extractor(html) for page, html in corpus}
+        elapsed = time.perf_counter() - start
+
+        if baseline is None and name == "reference":
+            baseline = elapsed
+        matches = sum(outputs[page] == expected[page] for page in outputs)
+        pages_per_second = len(corpus) * args.rounds / elapsed
+        megabytes_per_second = total_bytes * args.rounds / elapsed / 1e6
+        speedup = baseline / elapsed if baseline else 1.0
+        print(f"{name:<12}{pages_per_second:>12.1f}{megabytes_per_second:>10.1f}{speedup:>9.1f}x{matches:>6}/{len(corpus)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,389 @@
+"""Run the whole fact-check pipeline offline against local stand-in servers.
+
+Usage:
+    python -m benchmarks.offline_pipeline [--tweets 20] [--concurrency 1,4,8]
+        [--llm-latency 0.3] [--llm-429-rate 0.05] [--search-latency 0.2]
+        [--page-latency 0.05] [--snippet-confidence 90] [--pages-dir DIR] [--browser] [--stream]
+
+Three local servers stand in for the network:
+    - an OpenAI-compatible chat endpoint (Groq) with configurable latency,
+      a share of 429 responses carrying Retry-After, and a fixed confidence
+      for snippet-tier verdicts,
+    - a search stub answering ``/search?q=`` with hits on the news server,
+    - a static server of news articles and tweet pages.
+
+``--pages-dir`` may hold recorded pages in ``tweets/`` (pages with a
+``[data-testid="tweetText"]`` element) and ``news/``; otherwise a seeded
+synthetic corpus is generated. Without ``--browser`` the tweet text is
+pre-seeded into the tweet cache so no Chrome is needed; with it, tweet
+pages are loaded through the driver pool like real ones.
+
+For each concurrency level, ``check_tweet`` runs over every tweet with cold
+article and LLM caches. The report gives throughput, per-stage p50/p95
+from the trace spans and the peak RSS of this process and its children.
+"""
+import argparse
+import contextlib
+import functools
+import json
+import os
+import random
+import re
+import resource
+import shutil
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import requests
+from bs4 import BeautifulSoup
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+TOPICS = [
+    ("Mayor Alvarez", "a new metro line", "Lisbon"),
+    ("Senator Okafor", "a tax rebate", "Lagos"),
+    ("Minister Laurent", "a ban on plastic bags", "Lyon"),
+    ("Governor Haines", "a wildfire evacuation", "Sacramento"),
+    ("President Novak", "a trade agreement", "Prague"),
+    ("Chancellor Weber", "a pension reform", "Berlin"),
+    ("Premier Tanaka", "a rail strike settlement", "Osaka"),
+    ("Councillor Reyes", "a housing subsidy", "Manila"),
+]
+FILLER = ("Officials said the details would be published later this week. Critics questioned the timing "
+          "of the announcement, while supporters welcomed the decision. Analysts expect the measure to be "
+          "debated at length before it takes effect. ")
+
+
+def build_corpus(count, seed=7):
+    """Return synthetic ``(tweets, articles)``: tweet texts and news pages (title, html)."""
+    rng = random.Random(seed)
+    tweets = []
+    articles = []
+    for index in range(count):
+        person, thing, city = TOPICS[index % len(TOPICS)]
+        tweets.append(f"BREAKING: {person} announces {thing} in {city} starting next month #{index}")
+        for variant in range(3):
+            title = f"{person} announces {thing} in {city}" if variant == 0 else f"{city} reacts to {thing}"
+            paragraphs = "".join(
+                f"<p>{person} spoke in {city} about {thing}. {FILLER * rng.randint(1, 3)}</p>"
+                for _ in range(rng.randint(6, 14))
+            )
+            articles.append((title, f"<html><head><title>{title}</title></head><body>"
+                                    f"<nav>Menu</nav><article><h1>{title}</h1>{paragraphs}</article>"
+                                    f"<footer>Footer</footer></body></html>"))
+    return tweets, articles
+
+
+def tweet_page(text):
+    return (f'<html><body><article><div data-testid="tweetText"><span>{text}</span></div>'
+            f'</article></body></html>')
+
+
+def load_recorded_pages(pages_dir):
+    """Read ``tweets/`` and ``news/`` from a directory of recorded pages."""
+    tweets = []
+    articles = []
+    for name in sorted(os.listdir(os.path.join(pages_dir, "tweets"))):
+        with open(os.path.join(pages_dir, "tweets", name), "r", encoding="utf-8", errors="replace") as f:
+            element = BeautifulSoup(f.read(), "html.parser").select_one('[data-testid="tweetText"]')
+        if element is not None:
+            tweets.append(element.get_text(" ", strip=True))
+    for name in sorted(os.listdir(os.path.join(pages_dir, "news"))):
+        with open(os.path.join(pages_dir, "news", name), "r", encoding="utf-8", errors="replace") as f:
+            html = f.read()
+        title = BeautifulSoup(html, "html.parser").title
+        articles.append((title.get_text(strip=True) if title else name, html))
+    return tweets, articles
+
+
+class QuietHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def send_body(self, status, body, content_type, headers=None):
+        payload = body.encode("utf-8") if isinstance(body, str) else body
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FakeGroqHandler(QuietHandler):
+    """OpenAI-compatible ``/chat/completions`` with configurable latency and 429s."""
+    latency = 0.3
+    jitter = 0.1
+    rate_limit_share = 0.0
+    snippet_confidence = 90
+    counters = None
+    lock = threading.Lock()
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        with self.lock:
+            self.counters["requests"] += 1
+            limited = random.random() < self.rate_limit_share
+            if limited:
+                self.counters["rate_limited"] += 1
+        if limited:
+            self.send_body(429, json.dumps({"error": {"message": "rate limited"}}), "application/json",
+                           {"Retry-After": "1"})
+            return
+
+        time.sleep(max(0.0, random.gauss(self.latency, self.jitter)))
+        prompt = body["messages"][0]["content"]
+        if "news headlines" in prompt:
+            claim = prompt.split('"')[1] if prompt.count('"') >= 2 else "the claim"
+            words = claim.split()
+            text = "\n".join(" ".join(words[i:i + 6]) for i in range(0, min(len(words), 18), 6))
+        else:
+            text = "The tweet appears to be TRUE. The articles report the same announcement, date and place."
+            if "Confidence:" in prompt:
+                text += f"\nConfidence: {self.snippet_confidence}\nSources agree: yes"
+
+        if not body.get("stream"):
+            self.send_body(200, json.dumps({
+                "model": body.get("model"),
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": text}}],
+                "usage": {"prompt_tokens": len(prompt) // 4, "completion_tokens": len(text) // 4},
+            }), "application/json")
+            return
+
+        # Word-sized deltas that keep the line breaks, like the real stream
+        events = [json.dumps({"choices": [{"delta": {"content": word}}]}) for word in re.findall(r'\S+\s*', text)]
+        stream = "".join(f"data: {event}\n\n" for event in events) + "data: [DONE]\n\n"
+        self.send_body(200, stream, "text/event-stream")
+
+
+class FakeWebHandler(QuietHandler):
+    """Search stub at ``/search?q=`` plus the static news and tweet pages."""
+    tweets = []
+    articles = []
+    search_latency = 0.2
+    page_latency = 0.05
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path == "/search":
+            time.sleep(self.search_latency)
+            query = parse_qs(url.query).get("q", [""])[0]
+            count = int(parse_qs(url.query).get("n", ["3"])[0])
+            start = sum(map(ord, query)) % len(self.articles)
+            hits = []
+            for offset in range(count):
+                index = (start + offset) % len(self.articles)
+                title, _ = self.articles[index]
+                hits.append({"title": title, "href": f"http://{self.headers['Host']}/news/{index}.html",
+                             "body": f"{title}. {FILLER[:120]}"})
+            self.send_body(200, json.dumps(hits), "application/json")
+            return
+
+        time.sleep(self.page_latency)
+        parts = url.path.strip("/").split("/")
+        if len(parts) == 2 and parts[0] == "news" and parts[1].endswith(".html"):
+            index = int(parts[1][:-len(".html")])
+            if index < len(self.articles):
+                self.send_body(200, self.articles[index][1], "text/html; charset=utf-8")
+                return
+        if len(parts) == 3 and parts[1] == "status" and parts[2].isdigit():
+            index = int(parts[2]) - 1
+            if index < len(self.tweets):
+                self.send_body(200, tweet_page(self.tweets[index]), "text/html; charset=utf-8")
+                return
+        self.send_body(404, "not found", "text/plain")
+
+
+class StubSearchClient:
+    """Stands in for the DDGS client, querying the local search stub."""
+
+    def __init__(self, base_url):
+        self.base_url = base_url
+        self.session = requests.Session()
+
+    def text(self, keywords, max_results=3, **kwargs):
+        response = self.session.get(f"{self.base_url}/search", params={"q": keywords, "n": max_results}, timeout=10)
+        response.raise_for_status()
+        return response.json()
+
+
+def start_server(handler):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+class RssSampler:
+    """Track peak resident memory of this process and its children (Chrome) in a background thread."""
+
+    def __init__(self, interval=0.1):
+        self.interval = interval
+        self.peak_mb = 0.0
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+
+    def sample(self):
+        if psutil is None:
+            return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+        process = psutil.Process()
+        total = 0
+        for proc in [process] + process.children(recursive=True):
+            try:
+                total += proc.memory_info().rss
+            except psutil.Error:
+                pass
+        return total / (1024 * 1024)
+
+    def run(self):
+        while not self.stopped.is_set():
+            self.peak_mb = max(self.peak_mb, self.sample())
+            self.stopped.wait(self.interval)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stopped.set()
+        self.thread.join()
+        self.peak_mb = max(self.peak_mb, self.sample())
+
+
+def run_level(checker, tracing, llm, urls, concurrency, work_dir, stream):
+    """Check every URL with ``concurrency`` workers; returns the level's stats."""
+    trace_path = os.path.join(work_dir, f"trace-{concurrency}.jsonl")
+    tracing.tracer.close()
+    tracing.tracer.path = trace_path
+    # Cold caches for every level so the numbers are comparable
+    checker.article_cache = checker.ArticleCache(path=os.path.join(work_dir, f"articles-{concurrency}.sqlite3"))
+    if llm.cache is not None:
+        llm.cache = checker.ResponseCache()
+
+    def check(url):
+        tokens = (lambda token: None) if stream else None
+        return checker.check_tweet(url, llm=llm, on_verdict_token=tokens)
+
+    start = time.perf_counter()
+    with RssSampler() as rss, open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            results = list(executor.map(check, urls))
+    elapsed = time.perf_counter() - start
+    tracing.tracer.close()
+
+    rows = {row["span"]: row for row in tracing.summarize(tracing.read_spans(trace_path))}
+    return {
+        "concurrency": concurrency,
+        "checks": len(results),
+        "ok": sum(1 for result in results if result.verdict and not result.error),
+        "cut_short": sum(1 for result in results if result.cut_short),
+        "elapsed": elapsed,
+        "per_minute": len(results) / elapsed * 60 if elapsed else 0.0,
+        "peak_rss_mb": rss.peak_mb,
+        "spans": rows,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tweets", type=int, default=20)
+    parser.add_argument("--concurrency", default="1,4,8", help="comma-separated worker counts")
+    parser.add_argument("--llm-latency", type=float, default=0.3)
+    parser.add_argument("--llm-jitter", type=float, default=0.1)
+    parser.add_argument("--llm-429-rate", type=float, default=0.05, help="share of LLM requests answered with 429")
+    parser.add_argument("--search-latency", type=float, default=0.2)
+    parser.add_argument("--page-latency", type=float, default=0.05)
+    parser.add_argument("--snippet-confidence", type=int, default=90,
+                        help="confidence the stand-in LLM gives snippet-tier verdicts")
+    parser.add_argument("--pages-dir", default=None, help="recorded pages with tweets/ and news/ subdirectories")
+    parser.add_argument("--browser", action="store_true", help="load tweet pages in Chrome instead of the cache")
+    parser.add_argument("--stream", action="store_true", help="stream the verdict")
+    parser.add_argument("--llm-cache", action="store_true", help="keep the LLM response cache on")
+    args = parser.parse_args()
+
+    if args.pages_dir:
+        tweets, articles = load_recorded_pages(args.pages_dir)
+    else:
+        tweets, articles = build_corpus(args.tweets)
+    tweets = tweets[:args.tweets]
+    if not tweets or not articles:
+        print("No tweets or news pages to serve")
+        return
+
+    work_dir = tempfile.mkdtemp(prefix="offline-bench-")
+    # The checker reads its cache and trace locations at import time
+    os.environ["CHECKER_CACHE_DIR"] = work_dir
+    os.environ["CHECKER_TRACE"] = os.path.join(work_dir, "trace.jsonl")
+    import tracing
+    import Twitter_post_checker as checker
+
+    FakeGroqHandler.latency = args.llm_latency
+    FakeGroqHandler.jitter = args.llm_jitter
+    FakeGroqHandler.rate_limit_share = args.llm_429_rate
+    FakeGroqHandler.snippet_confidence = args.snippet_confidence
+    FakeGroqHandler.counters = {"requests": 0, "rate_limited": 0}
+    FakeWebHandler.tweets = tweets
+    FakeWebHandler.articles = articles
+    FakeWebHandler.search_latency = args.search_latency
+    FakeWebHandler.page_latency = args.page_latency
+
+    groq = start_server(FakeGroqHandler)
+    web = start_server(FakeWebHandler)
+    web_url = f"http://127.0.0.1:{web.server_address[1]}"
+    urls = [f"{web_url}/bench/status/{index}" for index in range(1, len(tweets) + 1)]
+
+    checker.get_search_client = functools.partial(StubSearchClient, web_url)
+    if not args.browser:
+        for url, text in zip(urls, tweets):
+            checker.tweet_cache.set(url, {"text": text, "source": "dom"})
+
+    llm = checker.GroqAPI(model_id="llama3-8b-8192", api_key="offline",
+                          cache=checker.ResponseCache() if args.llm_cache else None,
+                          requests_per_minute=100000, tokens_per_minute=100000000)
+    llm.api_url = f"http://127.0.0.1:{groq.server_address[1]}/openai/v1/chat/completions"
+
+    levels = [int(level) for level in args.concurrency.split(",") if level.strip()]
+    results = []
+    try:
+        for concurrency in levels:
+            print(f"Running {len(urls)} checks at concurrency {concurrency}...")
+            results.append(run_level(checker, tracing, llm, urls, concurrency, work_dir, args.stream))
+    finally:
+        groq.shutdown()
+        web.shutdown()
+        if args.browser:
+            checker.get_driver_pool().close()
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    print("\nOffline pipeline benchmark")
+    print("=" * 80)
+    print(f"LLM: {args.llm_latency:.2f}s latency, {args.llm_429_rate:.0%} 429s "
+          f"({FakeGroqHandler.counters['rate_limited']} of {FakeGroqHandler.counters['requests']} requests); "
+          f"search {args.search_latency:.2f}s; pages {args.page_latency:.2f}s")
+    print(f"{'workers':>8}{'checks':>8}{'ok':>6}{'cut':>6}{'time (s)':>10}{'per min':>10}{'peak RSS (MB)':>15}")
+    for level in results:
+        print(f"{level['concurrency']:>8}{level['checks']:>8}{level['ok']:>6}{level['cut_short']:>6}"
+              f"{level['elapsed']:>10.2f}{level['per_minute']:>10.1f}{level['peak_rss_mb']:>15.1f}")
+
+    span_names = sorted({name for level in results for name in level["spans"]})
+    headers = ["p50/p95 @" + str(level["concurrency"]) for level in results]
+    print(f"\n{'span':<24}" + "".join(f"{header:>18}" for header in headers))
+    for name in span_names:
+        cells = []
+        for level in results:
+            row = level["spans"].get(name)
+            cells.append(f"{row['p50']:.3f}/{row['p95']:.3f}" if row else "-")
+        print(f"{name:<24}" + "".join(f"{cell:>18}" for cell in cells))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""Compare full page loads against text-only mode on recorded tweet pages.
+
+Usage:
+    python -m benchmarks.page_load [pages_dir] [--repeat N]
+
+``pages_dir`` holds tweet pages saved from a browser ("Save page as ...,
+complete"), each containing a ``[data-testid="tweetText"]`` element. They
+are served from a local HTTP server so both modes see identical content.
+"""
+import argparse
+import functools
+import os
+import statistics
+import threading
+import time
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+from driver_pool import PooledDriver
+from latency import percentile
+from Twitter_post_checker import setup_driver, get_tweet_text
+
+
+class QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+def serve_directory(directory):
+    handler = functools.partial(QuietHandler, directory=directory)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def run_mode(text_only, urls, repeat):
+    driver = setup_driver(text_only=text_only)
+    pooled = PooledDriver(driver)
+    timings = []
+    found = 0
+    peak_rss = 0
+    try:
+        for _ in range(repeat):
+            for url in urls:
+                start = time.perf_counter()
+                text = get_tweet_text(driver, url)
+                timings.append(time.perf_counter() - start)
+                found += bool(text)
+                peak_rss = max(peak_rss, pooled.rss_mb())
+    finally:
+        driver.quit()
+    return {
+        "loads": len(timings),
+        "found": found,
+        "p50": statistics.median(timings) if timings else 0.0,
+        "p95": percentile(timings, 95),
+        "peak_rss_mb": peak_rss,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("pages_dir", nargs="?", default=os.path.join(os.path.dirname(__file__), "pages"))
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.pages_dir):
+        print(f"Recorded pages directory not found: {args.pages_dir}")
+        return
+
+    pages = sorted(name for name in os.listdir(args.pages_dir) if name.endswith((".html", ".htm")))
+    if not pages:
+        print(f"No recorded pages found in {args.pages_dir}")
+        return
+
+    server = serve_directory(args.pages_dir)
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    urls = [f"{base_url}/{name}" for name in pages]
+
+    try:
+        results = {
+            "full": run_mode(False, urls, args.repeat),
+            "text-only": run_mode(True, urls, args.repeat),
+        }
+    finally:
+        server.shutdown()
+
+    print("\nPage load benchmark")
+    print("=" * 80)
+    print(f"{'mode':<12}{'loads':>8}{'found':>8}{'p50 (s)':>12}{'p95 (s)':>12}{'peak RSS (MB)':>16}")
+    for mode, stats in results.items():
+        print(f"{mode:<12}{stats['loads']:>8}{stats['found']:>8}{stats['p50']:>12.3f}"
+              f"{stats['p95']:>12.3f}{stats['peak_rss_mb']:>16.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+import threading
+from contextlib import contextmanager
+
+
+class CheckCancelled(Exception):
+    """Raised inside the pipeline once its CancelToken has been cancelled."""
+
+
+class CancelToken:
+    """Cancellation flag shared between a running check and whoever started it.
+
+    Code doing blocking work (a page load, a streamed HTTP body) registers a
+    callback with ``on_cancel`` that aborts it, e.g. quitting the driver or
+    closing the response, so cancelling stops in-flight work rather than
+    waiting for it.
+    """
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.callbacks = []
+        self.lock = threading.Lock()
+
+    @property
+    def cancelled(self):
+        return self.event.is_set()
+
+    def cancel(self):
+        with self.lock:
+            if self.event.is_set():
+                return
+            self.event.set()
+            callbacks, self.callbacks = self.callbacks, []
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                print(f"Error while cancelling: {str(e)}")
+
+    def raise_if_cancelled(self):
+        if self.event.is_set():
+            raise CheckCancelled()
+
+    @contextmanager
+    def on_cancel(self, callback):
+        with self.lock:
+            already_cancelled = self.event.is_set()
+            if not already_cancelled:
+                self.callbacks.append(callback)
+        if already_cancelled:
+            callback()
+        try:
+            yield
+        finally:
+            with self.lock:
+                if callback in self.callbacks:
+                    self.callbacks.remove(callback)
@@ -0,0 +1,233 @@
+"""Long-running fact-check service with a local HTTP/JSON API.
+
+Usage:
+    python checker_server.py [--host 127.0.0.1] [--port 8765] [--workers 2] [--queue-size 32]
+
+Endpoints:
+    POST   /check          {"url": "...", "webhook": "http://..."}  -> 202 {"job_id": ...}
+                           429 when the queue is full
+    GET    /jobs/<job_id>  job status, plus the CheckResult once done
+    DELETE /jobs/<job_id>  cancel a queued or running job
+    GET    /health         queue depth, worker count and cache statistics
+
+The browser pool, HTTP sessions, LLM client and caches live for the whole
+process, so only the first check pays for cold start.
+"""
+import argparse
+import json
+import queue
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from cancellation import CancelToken
+from tweet_cache import tweet_status_id
+from Twitter_post_checker import (
+    GroqAPI, GROQ_API_KEY, HEDGE_REQUESTS, article_cache, check_tweet, get_driver_pool, get_http_session,
+    llm_response_cache, model_router, size_fanout_executors,
+)
+
+MAX_FINISHED_JOBS = 1000
+
+
+class CheckService:
+    """Bounded job queue in front of a fixed set of pipeline workers."""
+
+    def __init__(self, workers=2, queue_size=32):
+        self.llm = GroqAPI(model_id="llama3-8b-8192", api_key=GROQ_API_KEY, cache=llm_response_cache,
+                           hedge=HEDGE_REQUESTS, router=model_router)
+        self.jobs = OrderedDict()
+        self.lock = threading.Lock()
+        self.pending = queue.Queue(maxsize=queue_size)
+        size_fanout_executors(search_checks=workers, article_checks=workers)
+        self.workers = [threading.Thread(target=self.work, daemon=True, name=f"check-{i}") for i in range(workers)]
+        for worker in self.workers:
+            worker.start()
+
+    def submit(self, tweet_url, webhook=None):
+        """Queue a check; returns the job dict, or None when the queue is full."""
+        job = {
+            "job_id": uuid.uuid4().hex,
+            "url": tweet_url,
+            "webhook": webhook,
+            "status": "queued",
+            "submitted_at": time.time(),
+            "started_at": None,
+            "finished_at": None,
+            "result": None,
+            "cancel": CancelToken(),
+        }
+        with self.lock:
+            try:
+                self.pending.put_nowait(job["job_id"])
+            except queue.Full:
+                return None
+            self.jobs[job["job_id"]] = job
+        return job
+
+    def get(self, job_id):
+        with self.lock:
+            return self.jobs.get(job_id)
+
+    def cancel(self, job_id):
+        with self.lock:
+            job = self.jobs.get(job_id)
+            if job is None:
+                return None
+            if job["status"] not in ("queued", "running"):
+                return job
+            job["cancel"].cancel()
+            # A queued job never reaches a worker, so it finishes here; a running one finishes in work()
+            dequeued = job["status"] == "queued"
+            if dequeued:
+                job["status"] = "cancelled"
+                job["finished_at"] = time.time()
+        if dequeued:
+            self.notify(job)
+            self.prune()
+        return job
+
+    def work(self):
+        while True:
+            job_id = self.pending.get()
+            with self.lock:
+                job = self.jobs.get(job_id)
+                if job is None or job["status"] != "queued":
+                    continue
+                job["status"] = "running"
+                job["started_at"] = time.time()
+            try:
+                result = check_tweet(job["url"], llm=self.llm, cancel=job["cancel"])
+                job["result"] = result.to_dict()
+                if result.error == "Cancelled":
+                    job["status"] = "cancelled"
+                else:
+                    job["status"] = "done" if result.verdict else "failed"
+            except Exception as e:
+                job["result"] = {"error": str(e)}
+                job["status"] = "failed"
+            job["finished_at"] = time.time()
+
+            self.notify(job)
+            self.prune()
+
+    def notify(self, job):
+        if not job["webhook"]:
+            return
+        try:
+            get_http_session().post(job["webhook"], json=public_job(job), timeout=10)
+        except Exception as e:
+            print(f"Webhook for job {job['job_id']} failed: {str(e)}")
+
+    def prune(self):
+        with self.lock:
+            finished = [job_id for job_id, job in self.jobs.items() if job["finished_at"] is not None]
+            for job_id in finished[:max(0, len(finished) - MAX_FINISHED_JOBS)]:
+                del self.jobs[job_id]
+
+    def health(self):
+        with self.lock:
+            statuses = [job["status"] for job in self.jobs.values()]
+        return {
+            "queued": statuses.count("queued"),
+            "running": statuses.count("running"),
+            "queue_capacity": self.pending.maxsize,
+            "workers": len(self.workers),
+            "article_cache": article_cache.stats(),
+            "llm_cache": llm_response_cache.stats(),
+        }
+
+
+def public_job(job):
+    return {key: value for key, value in job.items() if key != "cancel"}
+
+
+class CheckRequestHandler(BaseHTTPRequestHandler):
+    service = None
+
+    def send_json(self, status, body):
+        payload = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        if status == 429:
+            self.send_header("Retry-After", "5")
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def job_id_from_path(self):
+        parts = self.path.strip("/").split("/")
+        return parts[1] if len(parts) == 2 and parts[0] == "jobs" else None
+
+    def do_POST(self):
+        if self.path.rstrip("/") != "/check":
+            self.send_json(404, {"error": "not found"})
+            return
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            body = json.loads(self.rfile.read(length) or b"{}")
+        except (ValueError, json.JSONDecodeError):
+            self.send_json(400, {"error": "body must be JSON"})
+            return
+
+        tweet_url = body.get("url") if isinstance(body, dict) else None
+        if not tweet_url or not tweet_status_id(tweet_url):
+            self.send_json(400, {"error": "url must be an x.com/twitter.com status URL"})
+            return
+
+        job = self.service.submit(tweet_url, webhook=body.get("webhook"))
+        if job is None:
+            self.send_json(429, {"error": "queue full, retry later"})
+            return
+        self.send_json(202, {"job_id": job["job_id"], "status": job["status"], "poll": f"/jobs/{job['job_id']}"})
+
+    def do_GET(self):
+        if self.path.rstrip("/") == "/health":
+            self.send_json(200, self.service.health())
+            return
+        job = self.service.get(self.job_id_from_path())
+        if job is None:
+            self.send_json(404, {"error": "unknown job"})
+            return
+        self.send_json(200, public_job(job))
+
+    def do_DELETE(self):
+        job = self.service.cancel(self.job_id_from_path())
+        if job is None:
+            self.send_json(404, {"error": "unknown job"})
+            return
+        self.send_json(200, {"job_id": job["job_id"], "status": job["status"]})
+
+    def log_message(self, format, *args):
+        print(f"{self.address_string()} - {format % args}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the fact-check HTTP service.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--queue-size", type=int, default=32)
+    args = parser.parse_args()
+
+    print("Warming up browser pool...")
+    pool = get_driver_pool()
+    pool.size = max(pool.size, args.workers)
+    pool.warm(args.workers)
+
+    CheckRequestHandler.service = CheckService(workers=args.workers, queue_size=args.queue_size)
+    server = ThreadingHTTPServer((args.host, args.port), CheckRequestHandler)
+    print(f"Fact-check service listening on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        pool.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -4,10 +4,15 @@ import re
 import time
 import tempfile
 import os
+import queue
+import threading
 import tkinter as tk
 from tkinter import ttk
 from tkinter import messagebox
 
+from cancellation import CancelToken
+from Twitter_post_checker import check_tweet
+
 def create_temp_script(content, file_name):
     """Create a temporary script file with the given content."""
     temp_dir = tempfile.gettempdir()
@@ -19,27 +24,6 @@ def create_temp_script(content, file_name):
     return file_path
 
 
-def extract_analysis_from_output(output):
-    """Extract the factual analysis from the checker script output."""
-    # Look for text between "Factual Analysis:" and a line of equal signs
-    analysis_match = re.search(r'Factual Analysis:\n={1,80}\n(.*?)={1,80}', output, re.DOTALL)
-
-    if analysis_match:
-        # Return the captured group (the analysis)
-        return analysis_match.group(1).strip()
-    else:
-        # Fallback: try to find any analysis-like content
-        lines = output.split('\n')
-        for i, line in enumerate(lines):
-            if "analyzing tweet truthfulness" in line.lower():
-                # Return the next non-empty line
-                for j in range(i + 1, len(lines)):
-                    if lines[j].strip() and not lines[j].startswith("="):
-                        return lines[j].strip()
-
-    return "Based on fact-checking, this tweet's accuracy could not be fully verified."
-
-
 def is_tweet_false(analysis):
     """Determine if the tweet is false based on the analysis."""
     if not analysis:
@@ -76,48 +60,15 @@ def is_tweet_false(analysis):
     # return negative_score > positive_score
 
 
-def run_checker_script(tweet_url):
-    """Run the Twitter post checker script and capture its output."""
+def run_checker(tweet_url, on_verdict_token=None, on_stage=None, cancel=None):
+    """Run the fact-check pipeline in-process and return its CheckResult."""
     print(f"Checking factual accuracy of: {tweet_url}")
 
-    # Create a modified version of the checker script that prints the analysis to stdout
-    with open("Twitter_post_checker.py", "r") as f:
-        checker_content = f.read()
-
-    # Modify the script to accept command line argument
-    modified_content = checker_content.replace(
-        'tweet_url = input("Enter the Twitter/X post URL (e.g., https://x.com/username/status/123456): ")',
-        f'tweet_url = "{tweet_url}"'
-    )
-
-    # Create temporary modified script
-    temp_checker_path = create_temp_script(modified_content, "temp_checker.py")
-
     try:
-        # Run the modified script
-        result = subprocess.run(
-            [sys.executable, temp_checker_path],
-            capture_output=True,
-            text=True
-        )
-
-        if result.returncode != 0:
-            print("Error running Twitter post checker:")
-            print(result.stderr)
-            return None
-
-        # Extract the analysis from the output
-        return extract_analysis_from_output(result.stdout)
-
+        return check_tweet(tweet_url, on_verdict_token=on_verdict_token, on_stage=on_stage, cancel=cancel)
     except Exception as e:
-        print(f"Error running checker script: {str(e)}")
+        print(f"Error running checker: {str(e)}")
         return None
-    finally:
-        # Clean up
-        try:
-            os.remove(temp_checker_path)
-        except:
-            pass
 
 
 def run_reply_script(post_url, reply_text):
@@ -302,7 +253,6 @@ def show_response_options(root, tweet_url, analysis, tweet_text):
     extreme_btn.pack(side="left", padx=10, expand=True, fill="x")
     
     root.geometry("600x400")
-    root.mainloop()
 
 
 def show_final_confirmation(root, tweet_url, reply_text):
@@ -442,119 +392,181 @@ def show_true_response(root, tweet_url, analysis):
     
     
     root.geometry("600x400")
-    root.mainloop()
-
-def extract_tweet_text(tweet_url):
-    """More robust tweet extraction with proper Chrome setup"""
-    try:
-        # Create extraction script with proper Chrome setup
-        extract_code = f"""
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
-import time
-
-def setup_driver():
-    chrome_options = Options()
-    chrome_options.add_argument("--headless")
-    chrome_options.add_argument("--disable-gpu")
-    chrome_options.add_argument("--no-sandbox")
-    service = Service(ChromeDriverManager().install())
-    return webdriver.Chrome(service=service, options=chrome_options)
-
-def get_tweet_text(driver, url):
-    driver.get(url)
-    try:
-        tweet_element = WebDriverWait(driver, 20).until(
-            EC.presence_of_element_located((By.CSS_SELECTOR, '[data-testid="tweetText"]'))
-        )
-        return tweet_element.text
-    except Exception as e:
-        print(f"Extraction error: {{str(e)}}")
-        return None
 
-driver = None
-try:
-    driver = setup_driver()
-    tweet_text = get_tweet_text(driver, '{tweet_url}')
-    with open("tweet_text_temp.txt", "w") as f:
-        f.write(tweet_text if tweet_text else "")
-except Exception as e:
-    print(f"Error during extraction: {{str(e)}}")
-finally:
-    if driver:
-        driver.quit()
-"""
-
-        # Create temporary script
-        temp_extractor_path = create_temp_script(extract_code, "temp_tweet_extractor.py")
-        
-        # Run the script with timeout
-        subprocess.run(
-            [sys.executable, temp_extractor_path],
-            check=True,
-            timeout=30  # 30 second timeout
-        )
-        
-        # Read results
-        try:
-            with open("tweet_text_temp.txt", "r") as f:
-                return f.read().strip()
-        except FileNotFoundError:
-            return ""
-            
-    except subprocess.TimeoutExpired:
-        print("Tweet extraction timed out")
-        return ""
-    except Exception as e:
-        print(f"Error extracting tweet text: {{str(e)}}")
-        return ""
-    finally:
-        # Clean up
-        try:
-            os.remove(temp_extractor_path)
-            os.remove("tweet_text_temp.txt")
-        except:
-            pass
-
-def main():
-    # Get tweet URL from command line or prompt
-    if len(sys.argv) > 1:
-        tweet_url = sys.argv[1]
-    else:
-        tweet_url = input("Enter the Twitter/X post URL to analyze and reply to: ")
-    
-    # Create GUI root
-    root = tk.Tk()
-    root.withdraw()  # Hide the main window initially
-    
-    # Step 1: Run the checker script to analyze the tweet
-    analysis = run_checker_script(tweet_url)
-    
+STAGE_LABELS = {
+    "tweet": "Fetch tweet",
+    "headlines": "Generate headlines",
+    "search": "Search news",
+    "snippet_verdict": "Check snippets",
+    "articles": "Read articles",
+    "verdict": "Write verdict",
+}
+
+
+class CheckerWindow:
+    """Main window: runs checks on a worker thread with per-stage progress, cancel and a URL queue.
+
+    The worker only puts ``(job_id, kind, value)`` messages on a queue; the
+    Tk thread drains it, so updates from a cancelled job are simply ignored.
+    """
+
+    def __init__(self, root):
+        self.root = root
+        self.pending_urls = []
+        self.job_id = 0
+        self.current = None
+        self.updates = queue.Queue()
+        self.stage_started = {}
+        self.stage_elapsed = {}
+
+        root.title("Tweet fact-checker")
+        root.geometry("640x520")
+
+        entry_frame = ttk.Frame(root, padding="10")
+        entry_frame.pack(fill="x")
+        self.url_entry = ttk.Entry(entry_frame)
+        self.url_entry.pack(side="left", fill="x", expand=True, padx=(0, 10))
+        self.url_entry.bind("<Return>", lambda event: self.submit_entry())
+        ttk.Button(entry_frame, text="Check / Queue", command=self.submit_entry).pack(side="right")
+
+        self.queue_label = ttk.Label(root, text="Queued: 0", padding=(10, 0))
+        self.queue_label.pack(anchor="w")
+
+        progress_frame = ttk.Frame(root, padding="10")
+        progress_frame.pack(fill="x")
+        self.current_label = ttk.Label(progress_frame, text="Idle", font=("Arial", 11, "bold"))
+        self.current_label.grid(row=0, column=0, columnspan=2, sticky="w", pady=(0, 5))
+        self.stage_labels = {}
+        for row, (stage, label) in enumerate(STAGE_LABELS.items(), 1):
+            ttk.Label(progress_frame, text=label, width=22).grid(row=row, column=0, sticky="w")
+            status = ttk.Label(progress_frame, text="-")
+            status.grid(row=row, column=1, sticky="w")
+            self.stage_labels[stage] = status
+
+        ttk.Label(root, text="Analysis Result:", font=("Arial", 12, "bold"), padding=(10, 0)).pack(anchor="w")
+        self.text_area = tk.Text(root, wrap="word", height=10, width=70)
+        self.text_area.pack(fill="both", expand=True, padx=10, pady=5)
+
+        button_frame = ttk.Frame(root, padding="10")
+        button_frame.pack(fill="x")
+        self.cancel_button = ttk.Button(button_frame, text="Cancel", command=self.cancel_current, state="disabled")
+        self.cancel_button.pack(side="right")
+
+        root.after(100, self.poll_updates)
+
+    def submit_entry(self):
+        tweet_url = self.url_entry.get().strip()
+        if tweet_url:
+            self.url_entry.delete(0, "end")
+            self.enqueue(tweet_url)
+
+    def enqueue(self, tweet_url):
+        self.pending_urls.append(tweet_url)
+        self.queue_label.config(text=f"Queued: {len(self.pending_urls)}")
+        if self.current is None:
+            self.start_next()
+
+    def start_next(self):
+        if not self.pending_urls:
+            self.current = None
+            self.current_label.config(text="Idle")
+            self.cancel_button.config(state="disabled")
+            return
+
+        tweet_url = self.pending_urls.pop(0)
+        self.queue_label.config(text=f"Queued: {len(self.pending_urls)}")
+        self.job_id += 1
+        job_id = self.job_id
+        cancel = CancelToken()
+        self.current = (job_id, tweet_url, cancel)
+
+        self.stage_started = {}
+        self.stage_elapsed = {}
+        for status in self.stage_labels.values():
+            status.config(text="waiting")
+        self.text_area.delete("1.0", "end")
+        self.current_label.config(text=f"Checking {tweet_url}")
+        self.cancel_button.config(state="normal")
+
+        def worker():
+            result = run_checker(
+                tweet_url,
+                on_verdict_token=lambda token: self.updates.put((job_id, "token", token)),
+                on_stage=lambda stage, status: self.updates.put((job_id, "stage", (stage, status, time.monotonic()))),
+                cancel=cancel
+            )
+            self.updates.put((job_id, "done", result))
+
+        threading.Thread(target=worker, daemon=True).start()
+
+    def cancel_current(self):
+        if self.current is None:
+            return
+        job_id, tweet_url, cancel = self.current
+        print(f"Cancelling check of {tweet_url}")
+        # Cancelling quits the job's browser and closes its HTTP streams in the background
+        threading.Thread(target=cancel.cancel, daemon=True).start()
+        for stage, status in self.stage_labels.items():
+            if stage not in self.stage_elapsed:
+                status.config(text="cancelled")
+        self.start_next()
+
+    def poll_updates(self):
+        while True:
+            try:
+                job_id, kind, value = self.updates.get_nowait()
+            except queue.Empty:
+                break
+            if self.current is None or job_id != self.current[0]:
+                continue
+
+            if kind == "stage":
+                stage, status, timestamp = value
+                if status == "started":
+                    self.stage_started[stage] = timestamp
+                elif status == "skipped":
+                    self.stage_elapsed[stage] = 0.0
+                    self.stage_labels[stage].config(text="skipped")
+                elif stage in self.stage_started:
+                    self.stage_elapsed[stage] = timestamp - self.stage_started[stage]
+                    self.stage_labels[stage].config(text=f"{status} ({self.stage_elapsed[stage]:.1f}s)")
+            elif kind == "token":
+                if value is None:
+                    self.text_area.delete("1.0", "end")
+                else:
+                    self.text_area.insert("end", value)
+                    self.text_area.see("end")
+            else:
+                tweet_url = self.current[1]
+                if value is None or value.error != "Cancelled":
+                    show_result(tk.Toplevel(self.root), tweet_url, value)
+                self.start_next()
+
+        now = time.monotonic()
+        for stage, started in self.stage_started.items():
+            if stage not in self.stage_elapsed:
+                self.stage_labels[stage].config(text=f"running ({now - started:.1f}s)")
+
+        self.root.after(100, self.poll_updates)
+
+
+def show_result(root, tweet_url, result):
+    """Classify the finished verdict and show the matching response options."""
+    analysis = result.verdict if result else None
     if not analysis:
         messagebox.showerror("Error", "Failed to generate analysis. Please try again.")
+        root.destroy()
         return
-    
+
     print("\nGenerated analysis:")
     print("-" * 60)
     print(analysis)
     print("-" * 60)
-    
-    # Extract tweet text for context in responses
-    tweet_text = extract_tweet_text(tweet_url)
-    
-    # Check if the tweet is false
-    is_false = is_tweet_false(analysis)
-    
-    
-    # Show appropriate UI based on analysis
-    root.deiconify()  # Show the window
-    
-    if is_false:
+
+    # Tweet text for context in responses, captured once by the checker
+    tweet_text = result.tweet_text
+
+    if is_tweet_false(analysis):
         # Show options for false tweet
         show_response_options(root, tweet_url, analysis, tweet_text)
     else:
@@ -562,5 +574,14 @@ def main():
         show_true_response(root, tweet_url, analysis)
 
 
+def main():
+    # Tweet URLs from the command line are queued; more can be added in the window
+    root = tk.Tk()
+    window = CheckerWindow(root)
+    for tweet_url in sys.argv[1:]:
+        window.enqueue(tweet_url)
+    root.mainloop()
+
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
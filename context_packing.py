@@ -0,0 +1,141 @@
+import math
+import os
+import re
+from collections import Counter
+
+from relevance import tokenize
+
+# Evidence tokens allowed in the verdict prompt, per model
+EVIDENCE_TOKEN_BUDGETS = {
+    "llama-3.1-8b-instant": 500,
+    "llama3-8b-8192": 500,
+    "mixtral-8x7b-32768": 700,
+    "llama2-7b-4096": 400,
+}
+DEFAULT_EVIDENCE_TOKENS = int(os.environ.get("EVIDENCE_TOKEN_BUDGET", "500"))
+
+MIN_SENTENCE_CHARS = 30
+MAX_SENTENCE_CHARS = 400
+# Extra score per tweet entity (name, number) a sentence repeats
+ENTITY_BOOST = 0.1
+
+
+def evidence_token_budget(model):
+    return EVIDENCE_TOKEN_BUDGETS.get(model, DEFAULT_EVIDENCE_TOKENS)
+
+
+def estimate_tokens(text):
+    """Rough token count, the same len/4 estimate the rate limiter uses."""
+    return len(text) // 4 + 1
+
+
+def split_sentences(text):
+    """Split article text into sentences, dropping fragments and clipping run-ons."""
+    sentences = []
+    for sentence in re.split(r'(?<=[.!?])\s+(?=["\'“(]?[A-Z0-9])', re.sub(r'\s+', ' ', text or "").strip()):
+        sentence = sentence.strip()
+        if len(sentence) < MIN_SENTENCE_CHARS:
+            continue
+        if len(sentence) > MAX_SENTENCE_CHARS:
+            sentence = sentence[:MAX_SENTENCE_CHARS].rsplit(" ", 1)[0] + "..."
+        sentences.append(sentence)
+    return sentences
+
+
+def tweet_entities(tweet_text):
+    """Capitalised words and numbers in the tweet: the names, places and figures a claim hinges on."""
+    return {word.lower() for word in re.findall(r'\b(?:[A-Z][\w\'’-]+|\d[\d,.%]*)', tweet_text or "")
+            if word.lower() not in ("the", "a", "an", "breaking", "rt")}
+
+
+def tfidf_vectors(documents):
+    """Sparse L2-normalised TF-IDF vectors (term -> weight) for tokenised documents, IDF from the documents."""
+    document_frequency = Counter(term for document in documents for term in set(document))
+    count = len(documents)
+    vectors = []
+    for document in documents:
+        counts = Counter(document)
+        vector = {term: (1 + math.log(frequency)) * math.log(1 + count / document_frequency[term])
+                  for term, frequency in counts.items()}
+        norm = math.sqrt(sum(weight * weight for weight in vector.values())) or 1.0
+        vectors.append({term: weight / norm for term, weight in vector.items()})
+    return vectors
+
+
+def score_sentences(tweet_text, sentences):
+    """Cosine similarity of each sentence to the tweet in TF-IDF space, plus a boost for tweet entities."""
+    documents = [tokenize(sentence) for sentence in sentences]
+    vectors = tfidf_vectors(documents + [tokenize(tweet_text)])
+    query = vectors[-1]
+    entities = tweet_entities(tweet_text)
+
+    scores = []
+    for document, vector in zip(documents, vectors[:-1]):
+        similarity = sum(weight * query.get(term, 0.0) for term, weight in vector.items())
+        scores.append(similarity + ENTITY_BOOST * len(entities.intersection(document)))
+    return scores
+
+
+def pack_evidence(tweet_text, articles, token_budget):
+    """Choose the sentences most relevant to the tweet from ``articles`` within ``token_budget``.
+
+    ``articles`` is a list of article texts. Each article first gets its
+    best sentence (when it fits), then the remaining budget goes to the
+    highest-scoring sentences overall that share anything with the tweet.
+    Returns one string per article with its chosen sentences in their
+    original order ("" when none were chosen).
+    """
+    candidates = []
+    seen = set()
+    for article_index, text in enumerate(articles):
+        for position, sentence in enumerate(split_sentences(text)):
+            key = sentence.lower()
+            if key in seen:
+                continue
+            seen.add(key)
+            candidates.append((article_index, position, sentence))
+    if not candidates:
+        return ["" for _ in articles]
+
+    scores = score_sentences(tweet_text, [sentence for _, _, sentence in candidates])
+    ranked = sorted(range(len(candidates)), key=lambda index: scores[index], reverse=True)
+
+    chosen = set()
+    used = 0
+
+    def take(index):
+        nonlocal used
+        # Count the space that joins it to its neighbours
+        cost = estimate_tokens(candidates[index][2] + " ")
+        if index in chosen or used + cost > token_budget:
+            return
+        chosen.add(index)
+        used += cost
+
+    covered = set()
+    for index in ranked:
+        if candidates[index][0] not in covered:
+            covered.add(candidates[index][0])
+            take(index)
+    # Fill with whatever else is relevant; sentences sharing nothing with the tweet (menus, bylines) stay out
+    for index in ranked:
+        if scores[index] <= 0:
+            break
+        take(index)
+
+    packed = [[] for _ in articles]
+    for index in sorted(chosen, key=lambda index: candidates[index][:2]):
+        packed[candidates[index][0]].append(candidates[index][2])
+    return [" ".join(sentences) for sentences in packed]
+
+
+def fit_to_budget(text, token_budget):
+    """Cut ``text`` at a sentence or word boundary so it fits ``token_budget``; a guard, not a ranker."""
+    if estimate_tokens(text) <= token_budget:
+        return text
+    limit = token_budget * 4
+    cut = text[:limit]
+    boundary = max(cut.rfind(". "), cut.rfind("\n"))
+    if boundary > limit // 2:
+        return cut[:boundary + 1]
+    return cut.rsplit(" ", 1)[0] + "..."
@@ -0,0 +1,47 @@
+import threading
+import time
+
+
+class Deadline:
+    """End-to-end time budget for one check, passed through every stage.
+
+    Stages ask for ``timeout(cap, reserve)`` instead of using fixed
+    timeouts, so a slow stage eats into its own budget and not into the
+    time kept back for later stages. When a stage degrades (snippets
+    instead of articles, fallback verdict) it records itself with
+    ``cut``, and the names end up in ``CheckResult.cut_short``.
+    """
+
+    def __init__(self, seconds=None, expires_at=None, parent=None):
+        if expires_at is None and seconds is not None:
+            expires_at = time.monotonic() + seconds
+        self.expires_at = expires_at
+        self.parent = parent
+        self.cut_short = []
+        self.lock = threading.Lock()
+
+    def remaining(self):
+        if self.expires_at is None:
+            return float("inf")
+        return max(0.0, self.expires_at - time.monotonic())
+
+    @property
+    def expired(self):
+        return self.remaining() <= 0
+
+    def timeout(self, cap, reserve=0.0):
+        """Seconds a call may take: at most ``cap``, leaving ``reserve`` for later stages."""
+        return max(0.0, min(cap, self.remaining() - reserve))
+
+    def sub(self, cap, reserve=0.0):
+        """A child deadline for one stage, ending ``reserve`` seconds before this one."""
+        return Deadline(expires_at=time.monotonic() + self.timeout(cap, reserve), parent=self)
+
+    def cut(self, stage):
+        if self.parent is not None:
+            self.parent.cut(stage)
+            return
+        with self.lock:
+            if stage not in self.cut_short:
+                print(f"Deadline: {stage} stage cut short")
+                self.cut_short.append(stage)
@@ -0,0 +1,165 @@
+import atexit
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+
+class PooledDriver:
+    """A WebDriver plus the bookkeeping the pool needs to decide when to recycle it."""
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.pages = 0
+        self.created_at = time.time()
+
+    def rss_mb(self):
+        """Resident memory of chromedriver and its Chrome children, in MB."""
+        if psutil is None:
+            return 0
+        try:
+            process = psutil.Process(self.driver.service.process.pid)
+            processes = [process] + process.children(recursive=True)
+            total = 0
+            for proc in processes:
+                try:
+                    total += proc.memory_info().rss
+                except psutil.Error:
+                    pass
+            return total / (1024 * 1024)
+        except Exception:
+            return 0
+
+    def is_healthy(self):
+        try:
+            self.driver.execute_script("return 1")
+            return True
+        except Exception:
+            return False
+
+    def quit(self):
+        try:
+            self.driver.quit()
+        except Exception:
+            pass
+
+
+class DriverPool:
+    """Long-lived pool of headless drivers with checkout/return semantics.
+
+    Drivers are launched on demand up to ``size`` (or ahead of time with
+    ``warm``), health-checked on checkout and recycled after ``max_pages``
+    page loads or once Chrome grows past ``max_rss_mb``.
+    """
+
+    def __init__(self, factory, size=2, max_pages=50, max_rss_mb=1024):
+        self.factory = factory
+        self.size = size
+        self.max_pages = max_pages
+        self.max_rss_mb = max_rss_mb
+        self.idle = []
+        self.created = 0
+        self.closed = False
+        self.condition = threading.Condition()
+        atexit.register(self.close)
+
+    def _launch(self):
+        print("Launching pooled Chrome driver...")
+        return PooledDriver(self.factory())
+
+    def warm(self, count=None):
+        """Pre-launch drivers so the first checkouts only pay for navigation."""
+        count = self.size if count is None else min(count, self.size)
+        while True:
+            with self.condition:
+                if self.closed or self.created >= count:
+                    return
+                self.created += 1
+            try:
+                pooled = self._launch()
+            except Exception:
+                with self.condition:
+                    self.created -= 1
+                    self.condition.notify()
+                raise
+            with self.condition:
+                self.idle.append(pooled)
+                self.condition.notify()
+
+    def _needs_recycle(self, pooled):
+        if pooled.pages >= self.max_pages:
+            return True
+        if self.max_rss_mb and pooled.rss_mb() > self.max_rss_mb:
+            return True
+        return False
+
+    def _discard(self, pooled):
+        pooled.quit()
+        with self.condition:
+            self.created -= 1
+            self.condition.notify()
+
+    def checkout(self, timeout=None):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self.condition:
+                while not self.idle and self.created >= self.size and not self.closed:
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        raise TimeoutError("No driver available in pool")
+                    self.condition.wait(remaining)
+                if self.closed:
+                    raise RuntimeError("Driver pool is closed")
+                if self.idle:
+                    pooled = self.idle.pop()
+                else:
+                    self.created += 1
+                    pooled = None
+
+            if pooled is None:
+                try:
+                    return self._launch()
+                except Exception:
+                    with self.condition:
+                        self.created -= 1
+                        self.condition.notify()
+                    raise
+
+            if pooled.is_healthy():
+                return pooled
+            print("Pooled driver failed health check, replacing it")
+            self._discard(pooled)
+
+    def checkin(self, pooled, broken=False):
+        pooled.pages += 1
+        if broken or self.closed or self._needs_recycle(pooled):
+            self._discard(pooled)
+            return
+        with self.condition:
+            self.idle.append(pooled)
+            self.condition.notify()
+
+    @contextmanager
+    def driver(self, timeout=None):
+        pooled = self.checkout(timeout)
+        broken = False
+        try:
+            yield pooled.driver
+        except Exception:
+            broken = not pooled.is_healthy()
+            raise
+        finally:
+            self.checkin(pooled, broken=broken)
+
+    def close(self):
+        with self.condition:
+            self.closed = True
+            idle, self.idle = self.idle, []
+            self.created -= len(idle)
+            self.condition.notify_all()
+        for pooled in idle:
+            pooled.quit()
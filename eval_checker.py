@@ -0,0 +1,274 @@
+"""Replay labeled cases through the fact-check pipeline and score speed and verdict quality together.
+
+Usage:
+    python eval_checker.py ["Untitled spreadsheet.xlsx" | cases.jsonl] [--workers 4]
+        [--network cached|live|stub] [-o eval_results.jsonl]
+
+Cases come from the spreadsheet ("POST" and "lLLM REPLY" columns) or from
+JSONL objects with ``post`` (tweet text) or ``url``, ``expected`` (the
+reference verdict text) and an optional ``label`` ("true"/"false"). The
+``is_tweet_false`` target is ``label`` if given, else the verdict word in
+``expected`` (false, misleading or unverified count as false).
+
+Network modes:
+    cached  search results and article pages are recorded under
+            .cache/eval on first use and replayed afterwards; the LLM is
+            live, since its verdicts are what is being judged
+    live    everything goes to the network
+    stub    the local stand-in servers from benchmarks.offline_pipeline
+
+Reported per case: the verdict label against the reference, whether
+``is_tweet_false`` agrees, latency and LLM tokens (from the trace spans).
+"""
+import argparse
+import contextlib
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import tracing
+import Twitter_post_checker as checker
+from comment_merge import is_tweet_false
+from latency import percentile
+
+EVAL_DIR = os.path.join(os.environ.get("CHECKER_CACHE_DIR", ".cache"), "eval")
+# Longer labels first so "partially true" is not read as "true"
+VERDICT_LABELS = ["partially true", "potentially misleading", "misleading", "unverified", "false", "true"]
+# Verdicts the reply flow should treat as a false tweet
+FALSE_LABELS = {"potentially misleading", "misleading", "unverified", "false"}
+
+
+def verdict_label(text):
+    """The verdict word used earliest in ``text`` (e.g. "false", "misleading"), or None."""
+    if not text:
+        return None
+    lower_text = text.lower()
+    best = None
+    for label in VERDICT_LABELS:
+        match = re.search(r'\b' + label + r'\b', lower_text)
+        if match and (best is None or match.start() < best[0]):
+            best = (match.start(), label)
+    return best[1] if best else None
+
+
+def load_spreadsheet_cases(path):
+    """Read (post, reply) pairs, joining rows where the post and its reply slipped onto adjacent lines."""
+    import openpyxl
+
+    sheet = openpyxl.load_workbook(path, read_only=True).active
+    rows = list(sheet.iter_rows(values_only=True))
+    header = [str(cell or "").strip().lower() for cell in rows[0]]
+    post_column = header.index("post")
+    reply_column = next(index for index, name in enumerate(header) if "reply" in name)
+
+    cases = []
+    lone_post = lone_reply = None
+    for row in rows[1:]:
+        post = str(row[post_column]).strip() if len(row) > post_column and row[post_column] else None
+        reply = str(row[reply_column]).strip() if len(row) > reply_column and row[reply_column] else None
+        if post and reply:
+            cases.append({"post": post, "expected": reply})
+            lone_post = lone_reply = None
+        elif post and lone_reply:
+            cases.append({"post": post, "expected": lone_reply})
+            lone_reply = None
+        elif reply and lone_post:
+            cases.append({"post": lone_post, "expected": reply})
+            lone_post = None
+        elif post:
+            lone_post = post
+        elif reply:
+            lone_reply = reply
+    return cases
+
+
+def load_jsonl_cases(path):
+    cases = []
+    with open(path, "r") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            post = record.get("post") or record.get("tweet_text") or record.get("text")
+            if not post and not record.get("url"):
+                continue
+            cases.append({"post": post, "url": record.get("url"),
+                          "expected": record.get("expected") or record.get("reply"), "label": record.get("label")})
+    return cases
+
+
+def load_cases(path):
+    cases = load_spreadsheet_cases(path) if path.endswith(".xlsx") else load_jsonl_cases(path)
+    for index, case in enumerate(cases):
+        case["id"] = index
+    return cases
+
+
+class RecordedSearchClient:
+    """Serve search results from a JSON recording, querying the live client only for new queries."""
+
+    def __init__(self, path, live_client):
+        self.path = path
+        self.live_client = live_client
+        self.lock = threading.Lock()
+        try:
+            with open(path, "r") as f:
+                self.results = json.load(f)
+        except (FileNotFoundError, ValueError):
+            self.results = {}
+
+    def text(self, keywords, max_results=3, **kwargs):
+        key = f"{keywords}|{max_results}"
+        with self.lock:
+            if key in self.results:
+                return self.results[key]
+        results = list(self.live_client().text(keywords, max_results=max_results, **kwargs))
+        with self.lock:
+            self.results[key] = results
+            with open(self.path, "w") as f:
+                json.dump(self.results, f)
+        return results
+
+
+def use_recorded_network(directory):
+    os.makedirs(directory, exist_ok=True)
+    search = RecordedSearchClient(os.path.join(directory, "search.json"), checker.get_search_client)
+    checker.get_search_client = lambda: search
+    checker.article_cache = checker.ArticleCache(path=os.path.join(directory, "articles.sqlite3"),
+                                                 ttl=365 * 24 * 60 * 60)
+
+
+def use_stub_network(llm, cases):
+    from benchmarks.offline_pipeline import (
+        FakeGroqHandler, FakeWebHandler, StubSearchClient, build_corpus, start_server,
+    )
+
+    FakeGroqHandler.counters = {"requests": 0, "rate_limited": 0}
+    FakeWebHandler.articles = build_corpus(max(len(cases), 1))[1]
+    groq = start_server(FakeGroqHandler)
+    web = start_server(FakeWebHandler)
+    checker.get_search_client = lambda: StubSearchClient(f"http://127.0.0.1:{web.server_address[1]}")
+    checker.article_cache = checker.ArticleCache(path=os.path.join(tempfile.mkdtemp(prefix="eval-stub-"), "articles.sqlite3"))
+    llm.api_url = f"http://127.0.0.1:{groq.server_address[1]}/openai/v1/chat/completions"
+    llm.requests_per_minute = 100000
+    llm.tokens_per_minute = 100000000
+    return [groq, web]
+
+
+def run_case(case, llm):
+    trace_id = uuid.uuid4().hex
+    start = time.perf_counter()
+    with tracing.tracer.trace(trace_id, case=case["id"]):
+        result = checker.check_tweet(case.get("url") or "", llm=llm, tweet_text=case.get("post"))
+    elapsed = time.perf_counter() - start
+
+    expected_label = verdict_label(case.get("expected"))
+    if case.get("label"):
+        expected_false = case["label"].lower() == "false"
+    elif expected_label:
+        expected_false = expected_label in FALSE_LABELS
+    else:
+        expected_false = is_tweet_false(case.get("expected"))
+    label = verdict_label(result.verdict)
+    return {
+        "id": case["id"],
+        "post": case.get("post") or result.tweet_text,
+        "trace": trace_id,
+        "expected_label": expected_label,
+        "label": label,
+        "agrees": expected_label is not None and label == expected_label,
+        "expected_false": expected_false,
+        "predicted_false": is_tweet_false(result.verdict),
+        "latency": round(elapsed, 3),
+        "error": result.error,
+        "cut_short": result.cut_short,
+        "tier": result.verdict_tier,
+        "verdict": result.verdict,
+    }
+
+
+def add_token_counts(records, trace_path):
+    tokens = {}
+    for span in tracing.read_spans(trace_path):
+        if span.get("span", "").startswith("llm_"):
+            used = span.get("prompt_tokens", 0) + span.get("completion_tokens", 0)
+            tokens[span["trace"]] = tokens.get(span["trace"], 0) + used
+    for record in records:
+        record["tokens"] = tokens.get(record["trace"], 0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("cases", nargs="?", default="Untitled spreadsheet.xlsx")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--network", choices=["cached", "live", "stub"], default="cached")
+    parser.add_argument("-o", "--output", default=None, help="write per-case results as JSONL")
+    args = parser.parse_args()
+
+    cases = load_cases(args.cases)
+    if not cases:
+        print(f"No cases found in {args.cases}")
+        return
+
+    llm = checker.GroqAPI(model_id="llama3-8b-8192", api_key=checker.GROQ_API_KEY,
+                          hedge=checker.HEDGE_REQUESTS, router=checker.model_router)
+    servers = []
+    if args.network == "cached":
+        use_recorded_network(EVAL_DIR)
+    elif args.network == "stub":
+        servers = use_stub_network(llm, cases)
+
+    trace_path = os.path.join(tempfile.mkdtemp(prefix="eval-trace-"), "trace.jsonl")
+    tracing.tracer.close()
+    tracing.tracer.path = trace_path
+
+    print(f"Replaying {len(cases)} cases with {args.workers} workers ({args.network} network)...")
+    start = time.perf_counter()
+    try:
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull), \
+                ThreadPoolExecutor(max_workers=args.workers) as executor:
+            records = list(executor.map(lambda case: run_case(case, llm), cases))
+    finally:
+        for server in servers:
+            server.shutdown()
+    elapsed = time.perf_counter() - start
+    tracing.tracer.close()
+    add_token_counts(records, trace_path)
+
+    print(f"\n{'case':>5} {'expected':>15} {'got':>15} {'agree':>6} {'false ok':>9} {'latency':>8} {'tokens':>7}  post")
+    for record in records:
+        false_ok = record["predicted_false"] == record["expected_false"]
+        print(f"{record['id']:>5} {str(record['expected_label']):>15} {str(record['label']):>15} "
+              f"{'yes' if record['agrees'] else 'no':>6} {'yes' if false_ok else 'no':>9} "
+              f"{record['latency']:>7.2f}s {record['tokens']:>7}  {(record['post'] or '')[:40]}")
+
+    labeled = [record for record in records if record["expected_label"]]
+    latencies = [record["latency"] for record in records]
+    tokens = [record["tokens"] for record in records]
+    print("\nSummary")
+    print("=" * 80)
+    if labeled:
+        agreed = sum(record["agrees"] for record in labeled)
+        print(f"Verdict agreement:        {agreed}/{len(labeled)} ({agreed / len(labeled):.0%})")
+    correct = sum(record["predicted_false"] == record["expected_false"] for record in records)
+    print(f"is_tweet_false accuracy:  {correct}/{len(records)} ({correct / len(records):.0%})")
+    print(f"Latency p50/p95:          {percentile(latencies, 50):.2f}s / {percentile(latencies, 95):.2f}s "
+          f"({elapsed:.1f}s wall clock)")
+    print(f"LLM tokens:               {sum(tokens)} total, {sum(tokens) / len(tokens):.0f} per case")
+    print(f"Errors / cut short:       {sum(1 for record in records if record['error'])} / "
+          f"{sum(1 for record in records if record['cut_short'])}")
+    print(f"Decided from snippets:    {sum(1 for record in records if record['tier'] == 'snippets')}/{len(records)}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            for record in records:
+                f.write(json.dumps(record) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,31 @@
+import threading
+from collections import deque
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of ``values`` (0 when empty)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * (len(ordered) - 1)))))
+    return ordered[index]
+
+
+class LatencyHistogram:
+    """Rolling window of recent latencies (seconds) for one model or stage."""
+
+    def __init__(self, window=200):
+        self.samples = deque(maxlen=window)
+        self.lock = threading.Lock()
+
+    def record(self, seconds):
+        with self.lock:
+            self.samples.append(seconds)
+
+    def count(self):
+        with self.lock:
+            return len(self.samples)
+
+    def percentile(self, pct):
+        with self.lock:
+            return percentile(list(self.samples), pct)
@@ -0,0 +1,117 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+
+def response_cache_key(model_id, prompt, temperature, max_tokens):
+    prompt_hash = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+    return (model_id, prompt_hash, temperature, max_tokens)
+
+
+class _InFlight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.cacheable = False
+        self.error = None
+
+
+class ResponseCache:
+    """In-memory LLM response cache with TTL, LRU size bound and request coalescing.
+
+    ``get_or_compute`` returns a cached response when one is fresh. If an
+    identical request is already running, it waits for that result instead
+    of sending a duplicate.
+    """
+
+    def __init__(self, ttl=15 * 60, max_entries=512):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.in_flight = {}
+        self.lock = threading.Lock()
+        self.counters = {"hits": 0, "misses": 0, "coalesced": 0, "wait_timeouts": 0}
+
+    def get(self, key):
+        with self.lock:
+            return self._get(key)
+
+    def _get(self, key):
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        value, stored_at = entry
+        if time.time() - stored_at > self.ttl:
+            del self.entries[key]
+            return None
+        self.entries.move_to_end(key)
+        return value
+
+    def set(self, key, value):
+        with self.lock:
+            self.entries[key] = (value, time.time())
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def get_or_compute(self, key, compute, wait_timeout=None, on_timeout=None):
+        """Return the cached value for ``key`` or run ``compute`` once for all concurrent callers.
+
+        ``compute`` returns ``(value, cacheable)``. Only cacheable answers are
+        shared with waiting callers; after a fallback answer
+        (``cacheable=False``) each of them tries again with its own
+        ``compute``. A caller waiting on someone else's request gives up
+        after ``wait_timeout`` seconds in total and returns ``on_timeout()``
+        (or raises TimeoutError without one).
+        """
+        give_up_at = time.monotonic() + wait_timeout if wait_timeout is not None else None
+        while True:
+            with self.lock:
+                value = self._get(key)
+                if value is not None:
+                    self.counters["hits"] += 1
+                    return value
+
+                pending = self.in_flight.get(key)
+                if pending is None:
+                    pending = self.in_flight[key] = _InFlight()
+                    leader = True
+                    self.counters["misses"] += 1
+                else:
+                    leader = False
+                    self.counters["coalesced"] += 1
+
+            if leader:
+                break
+            remaining = max(0.0, give_up_at - time.monotonic()) if give_up_at is not None else None
+            if not pending.done.wait(remaining):
+                with self.lock:
+                    self.counters["wait_timeouts"] += 1
+                if on_timeout is None:
+                    raise TimeoutError("Timed out waiting for an identical in-flight request")
+                return on_timeout()
+            if pending.error is not None:
+                raise pending.error
+            if pending.cacheable:
+                return pending.value
+            # The leader only got a fallback (its deadline ran out, or it was rate limited): try ourselves
+
+        try:
+            value, cacheable = compute()
+            pending.value = value
+            pending.cacheable = cacheable
+            if cacheable and self.ttl > 0:
+                self.set(key, value)
+            return value
+        except Exception as e:
+            pending.error = e
+            raise
+        finally:
+            with self.lock:
+                self.in_flight.pop(key, None)
+            pending.done.set()
+
+    def stats(self):
+        with self.lock:
+            return dict(self.counters, entries=len(self.entries))
@@ -0,0 +1,109 @@
+import random
+import threading
+from collections import deque
+from dataclasses import dataclass
+
+from latency import percentile
+
+
+@dataclass
+class ModelPolicy:
+    """Which models a pipeline task may use and what counts as acceptable service.
+
+    ``candidates`` are in preference order (cheapest/fastest first); the
+    router never picks a model outside this list.
+    """
+    candidates: list
+    max_p95_latency: float = 5.0
+    max_error_rate: float = 0.2
+    min_validity: float = 0.8
+    min_samples: int = 5
+    explore: float = 0.05
+
+
+class ModelRouter:
+    """Map pipeline tasks to models and adapt the choice from observed outcomes.
+
+    ``record`` keeps a rolling window of latency, API success and output
+    validity per (task, model). ``choose`` returns the first candidate
+    whose window is within the policy's bounds (or that has too few
+    samples to judge). It occasionally probes a preferred candidate that
+    fell out of bounds so a recovered model can win back traffic.
+    """
+
+    def __init__(self, policies, validators=None, window=50):
+        self.policies = policies
+        self.validators = validators or {}
+        self.window = window
+        self.samples = {}
+        self.lock = threading.Lock()
+
+    def _samples(self, task, model):
+        key = (task, model)
+        if key not in self.samples:
+            self.samples[key] = deque(maxlen=self.window)
+        return self.samples[key]
+
+    def model_stats(self, task, model):
+        with self.lock:
+            samples = list(self._samples(task, model))
+        if not samples:
+            return {"samples": 0, "p95_latency": 0.0, "error_rate": 0.0, "validity": 1.0}
+        ok_latencies = [latency for latency, ok, _ in samples if ok]
+        return {
+            "samples": len(samples),
+            "p95_latency": percentile(ok_latencies, 95),
+            "error_rate": sum(not ok for _, ok, _ in samples) / len(samples),
+            "validity": sum(valid for _, _, valid in samples) / len(samples),
+        }
+
+    def within_bounds(self, policy, stats):
+        return (stats["p95_latency"] <= policy.max_p95_latency
+                and stats["error_rate"] <= policy.max_error_rate
+                and stats["validity"] >= policy.min_validity)
+
+    def choose(self, task, default=None):
+        chosen = self.preferred(task, default)
+        policy = self.policies.get(task)
+        if policy is None or not policy.candidates:
+            return chosen
+
+        # Now and then probe a preferred model that fell out of bounds, so it can win traffic back
+        preferred = policy.candidates[:policy.candidates.index(chosen)]
+        if preferred and random.random() < policy.explore:
+            return random.choice(preferred)
+        return chosen
+
+    def preferred(self, task, default=None):
+        """The model ``choose`` settles on for ``task``, without the occasional exploration probe."""
+        policy = self.policies.get(task)
+        if policy is None or not policy.candidates:
+            return default
+
+        stats = {model: self.model_stats(task, model) for model in policy.candidates}
+        chosen = None
+        for model in policy.candidates:
+            if stats[model]["samples"] < policy.min_samples or self.within_bounds(policy, stats[model]):
+                chosen = model
+                break
+
+        if chosen is None:
+            # Nothing meets the bounds: take the least bad candidate
+            chosen = min(policy.candidates, key=lambda model: (
+                stats[model]["error_rate"] + (1 - stats[model]["validity"]),
+                stats[model]["p95_latency"],
+            ))
+        return chosen
+
+    def validate(self, task, text):
+        validator = self.validators.get(task)
+        return bool(text) and (validator is None or validator(text))
+
+    def record(self, task, model, latency, ok, valid):
+        with self.lock:
+            self._samples(task, model).append((latency, bool(ok), bool(valid)))
+
+    def stats(self):
+        with self.lock:
+            keys = list(self.samples)
+        return {f"{task}/{model}": self.model_stats(task, model) for task, model in keys}
@@ -0,0 +1,116 @@
+import re
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+DURATION_PATTERN = re.compile(r'(\d+(?:\.\d+)?)(ms|h|m|s)')
+
+
+def parse_duration(value):
+    """Parse Groq's reset durations ("2m59.56s", "7.66s", "120ms") into seconds."""
+    if value is None:
+        return None
+    value = str(value).strip()
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    total = 0.0
+    matched = False
+    for amount, unit in DURATION_PATTERN.findall(value):
+        matched = True
+        total += float(amount) * {"h": 3600, "m": 60, "s": 1, "ms": 0.001}[unit]
+    return total if matched else None
+
+
+def parse_retry_after(value):
+    """Parse a Retry-After header given either as seconds or as an HTTP date."""
+    if value is None:
+        return None
+    seconds = parse_duration(value)
+    if seconds is not None:
+        return seconds
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+    """Thread-safe token bucket refilled continuously at ``capacity`` per ``period`` seconds."""
+
+    def __init__(self, capacity, period=60.0):
+        self.capacity = float(capacity)
+        self.rate = self.capacity / period
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self.lock = threading.Lock()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount):
+        with self.lock:
+            now = time.monotonic()
+            self._refill(now)
+            amount = min(amount, self.capacity)
+            wait = max(0.0, self.blocked_until - now)
+            if self.tokens < amount:
+                wait = max(wait, (amount - self.tokens) / self.rate)
+            return wait
+
+    def consume(self, amount):
+        with self.lock:
+            self._refill(time.monotonic())
+            self.tokens -= min(amount, self.capacity)
+
+    def sync(self, remaining=None, reset_seconds=None):
+        """Align the local estimate with what the server reports."""
+        with self.lock:
+            now = time.monotonic()
+            self._refill(now)
+            if remaining is not None:
+                self.tokens = min(self.tokens, float(remaining))
+            if remaining is not None and remaining <= 0 and reset_seconds:
+                self.blocked_until = max(self.blocked_until, now + reset_seconds)
+
+
+class RateLimiter:
+    """Client-side requests/minute and tokens/minute budget for one model."""
+
+    def __init__(self, requests_per_minute, tokens_per_minute):
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+
+    def wait_time(self, token_estimate):
+        return max(self.requests.wait_time(1), self.tokens.wait_time(token_estimate))
+
+    def acquire(self, token_estimate, max_wait=None):
+        """Block until both buckets allow the request; returns False if that would exceed ``max_wait``."""
+        while True:
+            wait = self.wait_time(token_estimate)
+            if wait <= 0:
+                self.requests.consume(1)
+                self.tokens.consume(token_estimate)
+                return True
+            if max_wait is not None and wait > max_wait:
+                return False
+            time.sleep(min(wait, 1.0))
+
+    def update_from_headers(self, headers):
+        def number(name):
+            try:
+                return float(headers.get(name))
+            except (TypeError, ValueError):
+                return None
+
+        self.requests.sync(
+            number("x-ratelimit-remaining-requests"),
+            parse_duration(headers.get("x-ratelimit-reset-requests"))
+        )
+        self.tokens.sync(
+            number("x-ratelimit-remaining-tokens"),
+            parse_duration(headers.get("x-ratelimit-reset-tokens"))
+        )
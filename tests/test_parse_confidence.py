@@ -0,0 +1,76 @@
+from Twitter_post_checker import ConfidenceHoldback, parse_confidence
+
+
+def test_trailing_lines():
+    verdict, confidence, sources_agree = parse_confidence(
+        "The tweet is FALSE. Reuters reports no strike took place.\n\nConfidence: 85\nSources agree: yes")
+    assert verdict == "The tweet is FALSE. Reuters reports no strike took place."
+    assert confidence == 85
+    assert sources_agree is True
+
+
+def test_inline_confidence_keeps_verdict():
+    verdict, confidence, sources_agree = parse_confidence(
+        "Confidence: 92 - the tweet is FALSE; Reuters reports the claim was denied.\nSources agree: yes")
+    assert verdict == "the tweet is FALSE; Reuters reports the claim was denied."
+    assert confidence == 92
+    assert sources_agree is True
+
+
+def test_leading_lines():
+    verdict, confidence, sources_agree = parse_confidence(
+        "Confidence: 70%\nSources agree: no\nThe tweet is potentially misleading.")
+    assert verdict == "The tweet is potentially misleading."
+    assert confidence == 70
+    assert sources_agree is False
+
+
+def test_mention_in_evidence_is_kept():
+    verdict, confidence, _ = parse_confidence(
+        "The tweet is true. Officials expressed confidence in the ceasefire.\nConfidence: 60")
+    assert "expressed confidence in the ceasefire" in verdict
+    assert confidence == 60
+
+
+def test_only_scores_gives_empty_verdict():
+    verdict, confidence, sources_agree = parse_confidence("Confidence: 95\nSources agree: yes")
+    assert verdict == ""
+    assert confidence == 95
+
+
+def test_missing_values():
+    verdict, confidence, sources_agree = parse_confidence("The tweet is true.")
+    assert verdict == "The tweet is true."
+    assert confidence is None
+    assert sources_agree is None
+
+
+def test_out_of_100_and_labelled_scores():
+    verdict, confidence, _ = parse_confidence("The tweet is false.\nConfidence: 85/100\nSources agree: yes")
+    assert verdict == "The tweet is false."
+    assert confidence == 85
+
+    verdict, confidence, _ = parse_confidence("The tweet is true.\nConfidence score: 85\nSources agree: yes")
+    assert verdict == "The tweet is true."
+    assert confidence == 85
+
+    verdict, confidence, _ = parse_confidence("Confidence level: 40% - the tweet is unverified.")
+    assert verdict == "the tweet is unverified."
+    assert confidence == 40
+
+
+def stream(text, chunk_size):
+    pieces = []
+    holdback = ConfidenceHoldback(pieces.append)
+    for start in range(0, len(text), chunk_size):
+        holdback(text[start:start + chunk_size])
+    holdback.end_line()
+    return "".join(pieces)
+
+
+def test_holdback_streams_verdict_without_score_lines():
+    for text in ("The tweet is FALSE. Reuters reports no strike.\n\nConfidence: 85/100\nSources agree: yes",
+                 "Confidence: 92 - the tweet is FALSE; Reuters reports it was denied.\nSources agree: yes",
+                 "Confidence score: 70\nSources agree: no\nThe tweet is misleading.\nConfidence in it is low."):
+        for chunk_size in (1, 3, 7, len(text)):
+            assert stream(text, chunk_size) == parse_confidence(text)[0]
@@ -0,0 +1,48 @@
+from url_canon import canonicalize_url, collapse_near_duplicates, dedupe_urls
+
+
+def test_tracking_params_are_dropped():
+    assert canonicalize_url("https://www.example.com/a?utm_source=x&utm_medium=y&fbclid=1&gclid=2&mc_cid=3") \
+        == "https://example.com/a"
+
+
+def test_content_params_are_kept():
+    first = canonicalize_url("https://news.example.com/article.php?cid=1")
+    second = canonicalize_url("https://news.example.com/article.php?cid=2")
+    assert first != second
+    for name in ("s", "t", "cid", "src", "source", "share", "ref", "id"):
+        assert f"{name}=7" in canonicalize_url(f"https://example.com/view?{name}=7&utm_campaign=z")
+
+
+def test_query_order_and_scheme_do_not_matter():
+    assert canonicalize_url("http://example.com/a?b=2&a=1#top") == canonicalize_url("https://example.com/a?a=1&b=2")
+
+
+def test_default_ports_dropped_other_ports_kept():
+    assert canonicalize_url("https://example.com:443/a") == "https://example.com/a"
+    assert canonicalize_url("http://example.com:80/a") == "https://example.com/a"
+    assert canonicalize_url("https://example.com:8080/a") == "https://example.com:8080/a"
+    assert canonicalize_url("https://example.com:8080/a") != canonicalize_url("https://example.com/a")
+
+
+def test_amp_and_mobile_variants_collapse():
+    canonical = "https://example.com/news/story"
+    assert canonicalize_url("https://m.example.com/news/story/") == canonical
+    assert canonicalize_url("https://example.com/news/story/amp") == canonical
+    assert canonicalize_url("https://example-com.cdn.ampproject.org/c/s/example.com/news/story") == canonical
+
+
+def test_dedupe_keeps_distinct_content_params():
+    hits = [{"href": "https://news.example.com/article.php?cid=1"},
+            {"href": "https://news.example.com/article.php?cid=2"},
+            {"href": "https://news.example.com/article.php?cid=1&utm_source=feed"}]
+    assert [hit["href"] for hit in dedupe_urls(hits)] == [hits[0]["href"], hits[1]["href"]]
+
+
+def test_near_duplicates_collapse_but_short_hits_are_kept():
+    story = "Army says it is ready to strike again near the border, officials confirm"
+    hits = [{"href": "https://a.example.com/1", "title": "Army ready to strike", "body": story},
+            {"href": "https://b.example.com/2", "title": "Army ready to strike", "body": story + "."},
+            {"href": "https://c.example.com/3", "title": "", "body": ""},
+            {"href": "https://d.example.com/4", "title": "Video", "body": ""}]
+    assert [hit["href"] for hit in collapse_near_duplicates(hits)] == [hits[0]["href"], hits[2]["href"], hits[3]["href"]]
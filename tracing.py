@@ -0,0 +1,188 @@
+"""Per-stage timing spans written to a JSONL trace file.
+
+Each span is one line: the check's ``trace`` id, the span name, its start
+time and duration, plus whatever attributes the code attached (bytes,
+cache hit/miss, model, retries, ...). Tracing is off unless CHECKER_TRACE
+is set: to 1 for ``.cache/trace.jsonl``, or to a file path. The file is
+appended to and never rotated, so leave it off for long-running services.
+
+Summarise a trace file with p50/p95 per span:
+    python tracing.py [.cache/trace.jsonl]
+"""
+import contextvars
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+from latency import percentile
+
+DEFAULT_TRACE_PATH = os.path.join(os.environ.get("CHECKER_CACHE_DIR", ".cache"), "trace.jsonl")
+
+_current_trace = contextvars.ContextVar("current_trace", default=None)
+_current_span = contextvars.ContextVar("current_span", default=None)
+
+
+class Tracer:
+    """Append finished spans to ``path`` as JSON lines; a None path disables tracing."""
+
+    def __init__(self, path=DEFAULT_TRACE_PATH):
+        self.path = path
+        self.file = None
+        self.lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        return self.path is not None
+
+    def write(self, record):
+        line = json.dumps(record, default=str) + "\n"
+        with self.lock:
+            if self.file is None:
+                directory = os.path.dirname(self.path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                self.file = open(self.path, "a")
+            self.file.write(line)
+            self.file.flush()
+
+    @contextmanager
+    def trace(self, trace_id=None, **attrs):
+        """Group the spans opened inside this block (and in threads it hands work to) under one trace id.
+
+        Without ``trace_id``, a block nested in another trace joins it.
+        """
+        outer = _current_trace.get()
+        if trace_id is None and outer is not None:
+            trace_id = outer["id"]
+        token = _current_trace.set({"id": trace_id or uuid.uuid4().hex, **attrs})
+        try:
+            yield _current_trace.get()["id"]
+        finally:
+            _current_trace.reset(token)
+
+    @contextmanager
+    def span(self, name, **attrs):
+        """Time the block and write it as a span; ``annotate`` adds attributes from code inside it."""
+        if not self.enabled:
+            yield attrs
+            return
+
+        token = _current_span.set(attrs)
+        started_at = time.time()
+        start = time.perf_counter()
+        error = None
+        try:
+            yield attrs
+        except BaseException as e:
+            error = type(e).__name__
+            raise
+        finally:
+            _current_span.reset(token)
+            trace = _current_trace.get() or {}
+            record = {"trace": trace.get("id"), "span": name, "start": round(started_at, 3),
+                      "duration": round(time.perf_counter() - start, 4)}
+            record.update(attrs)
+            if error:
+                record["error"] = error
+            try:
+                self.write(record)
+            except OSError as e:
+                print(f"Could not write trace span: {str(e)}")
+
+    def close(self):
+        with self.lock:
+            if self.file is not None:
+                self.file.close()
+                self.file = None
+
+
+def _trace_path():
+    path = os.environ.get("CHECKER_TRACE", "")
+    if path in ("", "0"):
+        return None
+    return DEFAULT_TRACE_PATH if path == "1" else path
+
+
+tracer = Tracer(_trace_path())
+
+
+def annotate(**attrs):
+    """Attach attributes to the innermost open span, if any."""
+    span = _current_span.get()
+    if span is not None:
+        span.update(attrs)
+
+
+def add_counts(**amounts):
+    """Add numeric ``amounts`` (e.g. tokens) to the innermost open span, summing repeated calls."""
+    span = _current_span.get()
+    if span is not None:
+        for name, amount in amounts.items():
+            span[name] = span.get(name, 0) + amount
+
+
+def propagate(fn):
+    """Wrap ``fn`` so it runs with the caller's trace and span when handed to an executor thread."""
+    context = contextvars.copy_context()
+    return lambda *args, **kwargs: context.copy().run(fn, *args, **kwargs)
+
+
+def read_spans(path):
+    spans = []
+    with open(path, "r") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                spans.append(json.loads(line))
+            except ValueError:
+                continue
+    return spans
+
+
+def summarize(spans):
+    """Return one row per span name: count, p50/p95/max duration, errors and cache hit rate."""
+    by_name = {}
+    for span in spans:
+        by_name.setdefault(span.get("span"), []).append(span)
+
+    rows = []
+    for name, group in sorted(by_name.items(), key=lambda item: str(item[0])):
+        durations = [span.get("duration", 0.0) for span in group]
+        cached = [span["cache"] for span in group if span.get("cache")]
+        rows.append({
+            "span": name,
+            "count": len(group),
+            "p50": percentile(durations, 50),
+            "p95": percentile(durations, 95),
+            "max": max(durations),
+            "errors": sum(1 for span in group if span.get("error")),
+            "cache_hit_rate": (sum(1 for cache in cached if cache != "miss") / len(cached)) if cached else None,
+        })
+    return rows
+
+
+def main():
+    path = sys.argv[1] if len(sys.argv) > 1 else (_trace_path() or DEFAULT_TRACE_PATH)
+    try:
+        spans = read_spans(path)
+    except FileNotFoundError:
+        print(f"No trace file at {path}")
+        sys.exit(1)
+
+    traces = {span.get("trace") for span in spans}
+    print(f"{path}: {len(spans)} spans from {len(traces)} traces\n")
+    print(f"{'span':<24} {'count':>6} {'p50 (s)':>9} {'p95 (s)':>9} {'max (s)':>9} {'errors':>7} {'cache hit':>10}")
+    for row in summarize(spans):
+        hit_rate = f"{row['cache_hit_rate']:.0%}" if row["cache_hit_rate"] is not None else "-"
+        print(f"{str(row['span']):<24} {row['count']:>6} {row['p50']:>9.3f} {row['p95']:>9.3f} "
+              f"{row['max']:>9.3f} {row['errors']:>7} {hit_rate:>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+import json
+import os
+import re
+import threading
+import time
+
+DEFAULT_CACHE_PATH = os.path.join(os.environ.get("CHECKER_CACHE_DIR", ".cache"), "tweets.json")
+DEFAULT_TTL = 6 * 60 * 60
+
+
+def tweet_status_id(url):
+    """Return the numeric status ID from an x.com / twitter.com status URL."""
+    match = re.search(r'/status(?:es)?/(\d+)', url or "")
+    return match.group(1) if match else None
+
+
+class TweetCache:
+    """Small JSON file cache of tweet data keyed by status ID."""
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, ttl=DEFAULT_TTL):
+        self.path = path
+        self.ttl = ttl
+        self.lock = threading.Lock()
+
+    def _load(self):
+        try:
+            with open(self.path, "r") as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def _save(self, entries):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, "w") as f:
+            json.dump(entries, f)
+        os.replace(temp_path, self.path)
+
+    def get(self, url):
+        status_id = tweet_status_id(url)
+        if not status_id:
+            return None
+
+        with self.lock:
+            entry = self._load().get(status_id)
+        if not entry or time.time() - entry["fetched_at"] > self.ttl:
+            return None
+        return entry["value"]
+
+    def set(self, url, value):
+        status_id = tweet_status_id(url)
+        if not status_id or not value:
+            return
+
+        with self.lock:
+            entries = self._load()
+            now = time.time()
+            entries = {key: entry for key, entry in entries.items() if now - entry["fetched_at"] <= self.ttl}
+            entries[status_id] = {"value": value, "fetched_at": now}
+            try:
+                self._save(entries)
+            except OSError as e:
+                print(f"Could not write tweet cache: {str(e)}")
@@ -0,0 +1,95 @@
+import re
+
+# GraphQL operations the x.com status page issues for the focal tweet
+TWEET_OPERATIONS = ("TweetResultByRestId", "TweetDetail")
+TWEET_OPERATION_PATTERN = re.compile(r'/graphql/[^/]+/(' + "|".join(TWEET_OPERATIONS) + r')\b')
+
+
+def is_tweet_payload_url(url):
+    return bool(TWEET_OPERATION_PATTERN.search(url or ""))
+
+
+def _unwrap(result):
+    """Strip the visibility wrappers X puts around some tweet results."""
+    while isinstance(result, dict) and result.get("__typename") == "TweetWithVisibilityResults":
+        result = result.get("tweet")
+    if not isinstance(result, dict) or "legacy" not in result:
+        return None
+    return result
+
+
+def _tweet_fields(result):
+    legacy = result.get("legacy", {})
+    user_result = result.get("core", {}).get("user_results", {}).get("result", {})
+    user_legacy = user_result.get("legacy", {})
+    user_core = user_result.get("core", {})
+
+    note = result.get("note_tweet", {}).get("note_tweet_results", {}).get("result", {})
+    text = note.get("text") or legacy.get("full_text", "")
+
+    return {
+        "id": legacy.get("id_str") or result.get("rest_id"),
+        "text": text,
+        "author": user_legacy.get("screen_name") or user_core.get("screen_name"),
+        "author_name": user_legacy.get("name") or user_core.get("name"),
+        "created_at": legacy.get("created_at"),
+        "conversation_id": legacy.get("conversation_id_str"),
+        "in_reply_to": legacy.get("in_reply_to_status_id_str"),
+    }
+
+
+def _walk_tweet_results(node):
+    """Yield every tweet result object found anywhere in a GraphQL payload."""
+    if isinstance(node, dict):
+        for key, value in node.items():
+            if key in ("tweet_results", "tweetResult") and isinstance(value, dict):
+                tweet = _unwrap(value.get("result"))
+                if tweet:
+                    yield tweet
+            yield from _walk_tweet_results(value)
+    elif isinstance(node, list):
+        for item in node:
+            yield from _walk_tweet_results(item)
+
+
+def parse_tweet_payload(payload, status_id):
+    """Return the focal tweet's details from a TweetDetail/TweetResultByRestId payload.
+
+    The dict has the tweet's full text, author, timestamp, the quoted tweet
+    (if any) and the author's own thread parts around it. Returns None if
+    the payload does not contain ``status_id``.
+    """
+    tweets = {}
+    raw = {}
+    for result in _walk_tweet_results(payload):
+        fields = _tweet_fields(result)
+        if fields["id"] and fields["id"] not in tweets:
+            tweets[fields["id"]] = fields
+            raw[fields["id"]] = result
+
+    focal = tweets.get(status_id)
+    if focal is None:
+        return None
+
+    quoted = None
+    quoted_result = _unwrap(raw[status_id].get("quoted_status_result", {}).get("result"))
+    if quoted_result:
+        quoted_fields = _tweet_fields(quoted_result)
+        quoted = {key: quoted_fields[key] for key in ("id", "text", "author", "created_at")}
+
+    thread = [
+        tweet["text"] for tweet_id, tweet in sorted(tweets.items(), key=lambda item: int(item[0]))
+        if tweet["author"] == focal["author"]
+        and tweet["conversation_id"] == focal["conversation_id"]
+        and tweet_id != status_id
+    ]
+
+    return {
+        "text": focal["text"],
+        "author": focal["author"],
+        "author_name": focal["author_name"],
+        "created_at": focal["created_at"],
+        "quoted_tweet": quoted,
+        "thread": thread,
+        "source": "network",
+    }
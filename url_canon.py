@@ -0,0 +1,125 @@
+import hashlib
+import re
+from urllib.parse import parse_qsl, unquote, urlencode, urlsplit, urlunsplit
+
+from relevance import tokenize
+
+# Only keys that never change which article is served: click ids, analytics and campaign tags, AMP switches.
+# Short generic names (s, t, cid, src, ref, ...) pick the article on some sites and are kept.
+TRACKING_PARAMS = {
+    "fbclid", "gclid", "dclid", "gbraid", "wbraid", "msclkid", "yclid", "twclid", "igshid", "_ga", "_gl",
+    "_hsenc", "_hsmi", "guccounter", "ref_src", "ref_url", "smid", "smtyp", "amp", "outputtype",
+}
+TRACKING_PREFIXES = ("utm_", "mc_", "pk_", "mtm_", "hsa_")
+DEFAULT_PORTS = (80, 443)
+MOBILE_HOST_PREFIXES = ("www.", "m.", "mobile.", "amp.")
+AMP_PATH = re.compile(r"(/amp/?$|/amp(?=/)|\.amp(?=\.html?$|$)|/amp\.html?$)", re.IGNORECASE)
+
+# Two snippets whose 64-bit SimHashes differ in at most this many bits are the same story
+NEAR_DUPLICATE_BITS = 6
+
+
+def _unwrap_amp_cache(host, path):
+    """Map Google AMP cache / viewer URLs back to the publisher's URL."""
+    if host.endswith(".cdn.ampproject.org"):
+        match = re.match(r"^/[a-z](?:/s)?/(.+)$", path)
+        if match:
+            return match.group(1)
+    if host in ("google.com", "www.google.com") and path.startswith("/amp/"):
+        target = path[len("/amp/"):]
+        return target[2:] if target.startswith("s/") else target
+    return None
+
+
+def canonicalize_url(url):
+    """Canonical form of an article URL, used to spot duplicates and as the article cache key.
+
+    Lowercases the host, treats http and https alike, drops default ports,
+    the fragment, ``www.``/``m.``/``amp.`` host prefixes, tracking
+    parameters (``utm_*``, ``fbclid``, ...) and AMP path markers, unwraps
+    AMP cache URLs, and sorts the remaining query parameters.
+    """
+    parts = urlsplit((url or "").strip())
+    host = (parts.hostname or "").lower()
+    path = unquote(parts.path) or "/"
+
+    unwrapped = _unwrap_amp_cache(host, path)
+    if unwrapped:
+        return canonicalize_url("https://" + unwrapped + (f"?{parts.query}" if parts.query else ""))
+
+    for prefix in MOBILE_HOST_PREFIXES:
+        if host.startswith(prefix) and host.count(".") > 1:
+            host = host[len(prefix):]
+            break
+
+    path = AMP_PATH.sub("", path) or "/"
+    if len(path) > 1 and path.endswith("/"):
+        path = path.rstrip("/")
+
+    try:
+        port = parts.port
+    except ValueError:
+        port = None
+    if port and port not in DEFAULT_PORTS:
+        host = f"{host}:{port}"
+
+    query = sorted(
+        (name, value) for name, value in parse_qsl(parts.query, keep_blank_values=True)
+        if name.lower() not in TRACKING_PARAMS and not name.lower().startswith(TRACKING_PREFIXES)
+    )
+    scheme = "https" if parts.scheme.lower() in ("http", "https", "") else parts.scheme.lower()
+    return urlunsplit((scheme, host, path, urlencode(query), ""))
+
+
+def simhash(text, shingle_size=2):
+    """64-bit SimHash over word shingles of ``text`` (stopwords removed)."""
+    tokens = tokenize(text)
+    shingles = [" ".join(tokens[i:i + shingle_size]) for i in range(max(1, len(tokens) - shingle_size + 1))]
+    weights = [0] * 64
+    for shingle in shingles:
+        value = int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "big")
+        for bit in range(64):
+            weights[bit] += 1 if value >> bit & 1 else -1
+    return sum(1 << bit for bit in range(64) if weights[bit] > 0)
+
+
+def hamming_distance(a, b):
+    return bin(a ^ b).count("1")
+
+
+def dedupe_urls(hits):
+    """Drop hits whose URL canonicalizes to one already seen, keeping the first; adds ``canonical_url``."""
+    unique = []
+    seen = set()
+    for hit in hits:
+        url = hit.get("href")
+        if not url:
+            continue
+        canonical = canonicalize_url(url)
+        if canonical in seen:
+            continue
+        seen.add(canonical)
+        unique.append(dict(hit, canonical_url=canonical))
+    return unique
+
+
+def collapse_near_duplicates(hits, max_bits=NEAR_DUPLICATE_BITS, shingle_size=2):
+    """Drop hits whose title + snippet is a near-duplicate of an earlier one (e.g. syndicated wire copy).
+
+    Run it on ranked hits so the best-scoring copy of each story is kept.
+    Hits with too little text to form a shingle are always kept.
+    """
+    kept = []
+    fingerprints = []
+    for hit in hits:
+        text = f"{hit.get('title', '')} {hit.get('body', '')}"
+        if len(tokenize(text)) < shingle_size:
+            kept.append(hit)
+            continue
+        fingerprint = simhash(text, shingle_size)
+        if any(hamming_distance(fingerprint, other) <= max_bits for other in fingerprints):
+            print(f"Skipping near-duplicate result: {hit.get('href')}")
+            continue
+        kept.append(hit)
+        fingerprints.append(fingerprint)
+    return kept